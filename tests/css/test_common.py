@@ -6,6 +6,7 @@ import pytest
 
 from weasyprint import CSS
 from weasyprint.css import find_stylesheets, get_all_computed_styles
+from weasyprint.css.targets import TargetCollector
 from weasyprint.urls import URLFetcher, path2url
 
 from ..testing_utils import (  # isort:skip
@@ -164,6 +165,99 @@ def test_important():
         assert paragraph.style['color'] == (0, 1, 0, 1)  # lime (light green)
 
 
+@assert_no_logs
+def test_ancestor_combinators():
+    document = FakeHTML(string='''
+      <style>
+        p { color: red }
+        .report .table p { color: lime }
+        section > #b.c p { color: lime }
+        article ~ div .e + p { color: lime }
+        aside p, .table div p, #z p { color: red }
+      </style>
+      <div class="report"><div class="table"><p></p></div></div>
+      <section><div id="b" class="c"><div><p></p></div></div></section>
+      <article></article>
+      <div><span class="e"></span><p></p></div>
+    ''')
+    page, = document.render().pages
+    html, = page._page_box.children
+    body, = html.children
+    paragraphs = [
+        box for box in body.descendants() if box.element_tag == 'p']
+    assert len(paragraphs) == 3
+    for paragraph in paragraphs:
+        assert paragraph.style['color'] == (0, 1, 0, 1)  # lime (light green)
+
+
+@assert_no_logs
+def test_style_sharing():
+    document = FakeHTML(string='''
+      <style>
+        p { color: red }
+        .a p, .b p[title=b], .a p:nth-child(2) + p { color: lime }
+        p:first-child::before { color: lime; content: 'a' }
+        .b p, .b p:last-child, .a p:nth-child(2), p[title=a] {
+          color: blue }
+      </style>
+      <div class="a"><p></p><p></p><p></p><p title="a"></p></div>
+      <div class="b"><p></p><p title="b"></p><p></p></div>
+      <div class="a"><p></p><p></p><p></p><p title="a"></p></div>
+    ''')
+    page, = document.render().pages
+    html, = page._page_box.children
+    body, = html.children
+    lime, blue = (0, 1, 0, 1), (0, 0, 1, 1)
+    for div, colors in zip(body.children, (
+            (lime, blue, lime, blue), (blue, lime, blue),
+            (lime, blue, lime, blue))):
+        paragraphs = [
+            box for box in div.descendants() if box.element_tag == 'p']
+        assert [paragraph.style['color'] for paragraph in paragraphs] == list(colors)
+        line, = paragraphs[0].children
+        before, = line.children
+        assert before.style['color'] == lime
+
+
+@assert_no_logs
+def test_display_none_styles():
+    document = FakeHTML(string='''
+      <style>
+        div { display: none }
+        .a p { color: lime }
+        p::before { content: 'a'; color: blue }
+      </style>
+      <div class="a"><section><p></p></section></div>
+      <p></p>
+    ''')
+    style_for = get_all_computed_styles(document)
+    _head, body = document.etree_element
+    div, p = body
+    section, = div
+    hidden_p, = section
+    assert style_for(div)['display'] == ('none',)
+    assert style_for(hidden_p, 'before')['color'] == (0, 0, 1, 1)
+    assert style_for(hidden_p)['color'] == (0, 1, 0, 1)
+    assert style_for(section)['display'] == ('block', 'flow')
+    assert style_for(p)['color'] == (0, 0, 0, 1)
+    assert style_for(p, 'after') is None
+
+
+@assert_no_logs
+def test_display_none_anchors():
+    document = FakeHTML(string='''
+      <style>
+        div { display: none }
+        span { -weasy-anchor: 'b' }
+      </style>
+      <div><p id="a"><span></span></p></div>
+      <p style="-weasy-anchor: 'c'"></p>
+    ''')
+    target_collector = TargetCollector()
+    get_all_computed_styles(document, target_collector=target_collector)
+    assert set(target_collector.target_lookup_items) == {'a', 'b', 'c'}
+
+
 @assert_no_logs
 @pytest.mark.parametrize(('value', 'width'), [
     # Absolute units.
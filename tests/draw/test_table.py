@@ -1696,3 +1696,25 @@ def test_tables_border_tfoot(assert_pixels):
         <tfoot> <tr> <td style="border: none">E</td> </tr>
       </table>
     ''')
+
+
+@assert_no_logs
+def test_tables_border_collapse_corners_order(assert_pixels):
+    # Borders with the same score are painted in order: top border, then
+    # left and right borders, then bottom border.
+    assert_pixels('''
+      BBRRBB
+      BBRRBB
+      BB__BB
+      BB__BB
+      RRRRRR
+      RRRRRR
+    ''', '''
+      <style>
+        @page { size: 6px }
+        table { border-collapse: collapse }
+        td { width: 2px; height: 2px; padding: 0;
+             border: 2px solid; border-color: red blue }
+      </style>
+      <table><tr><td></td></tr></table>
+    ''')
@@ -437,6 +437,24 @@ def test_column_span_balance():
     assert column3.children[0].children[1].children[0].text == 'jkl'
 
 
+@assert_no_logs
+def test_columns_balance_blocks():
+    page, = render_pages('''
+      <style>
+        @page { margin: 0; size: 30px 20px }
+        div { columns: 3; column-gap: 0 }
+        section { height: 1px }
+      </style>
+      <div>%s</div>
+    ''' % ('<section></section>' * 7))
+    html, = page.children
+    body, = html.children
+    div, = body.children
+    assert div.height == 3
+    assert [len(column.children) for column in div.children] == [3, 3, 1]
+    assert [column.position_x for column in div.children] == [0, 10, 20]
+
+
 @assert_no_logs
 def test_columns_multipage():
     page1, page2 = render_pages('''
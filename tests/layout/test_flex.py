@@ -2120,3 +2120,34 @@ def test_flex_inline_grid():
     span, = div.children
     assert span.position_x == 2
     assert span.position_y == 2
+
+
+@assert_no_logs
+def test_flex_nested_containers():
+    page, = render_pages('''
+      <style>
+        @page { size: 100px }
+        body { font: 2px/1 weasyprint }
+        div { display: flex; padding-left: 1px }
+        div.column { flex-direction: column }
+      </style>
+      <div><div class="column"><div><div class="column"><div><div class="column">
+        <div><div class="column"><div><div class="column"><div>
+          <span>a</span><span>bc</span>
+        </div></div></div></div></div>
+      </div></div></div></div></div></div>
+    ''')
+    html, = page.children
+    body, = html.children
+    div, = body.children
+    depth = 0
+    while div.children[0].element_tag == 'div':
+        assert div.height == 2
+        assert div.children[0].position_x == depth + 1
+        div, = div.children
+        depth += 1
+    assert depth == 10
+    span_a, span_bc = div.children
+    assert span_a.position_x == 11
+    assert span_bc.position_x == 13
+    assert span_bc.width == 4
@@ -3,6 +3,8 @@
 import pytest
 
 from weasyprint.formatting_structure import boxes
+from weasyprint.layout import LayoutContext
+from weasyprint.layout.block import relative_positioning
 
 from ..testing_utils import assert_no_logs, render_pages
 
@@ -980,3 +982,66 @@ def test_float_break_after_page_no_fit():
     div, = body.children
     assert div.position_y == 0
     assert div.children[0].children[0].text == 'end'
+
+
+@assert_no_logs
+def test_float_stacked_lines():
+    page, = render_pages('''
+      <style>
+        body { width: 100px; font: 10px / 10px weasyprint }
+        div { float: left; clear: left; width: 20px; height: 15px }
+        div:nth-child(even) { float: right; clear: right }
+        p { margin: 0 }
+      </style>
+      <div></div><div></div><div></div><div></div><div></div><div></div>
+      <p>aaaaaa aaaaaa aaaaaa aaaaaa aaaaaa aaaaaa aaaaaa aaaaaa aaaaaa</p>''')
+    html, = page.children
+    body, = html.children
+    *divs, paragraph = body.children
+    assert [div.position_y for div in divs] == [0, 0, 15, 15, 30, 30]
+    assert [div.position_x for div in divs] == [0, 80, 0, 80, 0, 80]
+    lines = paragraph.children
+    assert [line.position_y for line in lines] == [
+        0, 10, 20, 30, 40, 50, 60, 70, 80]
+    assert [line.position_x for line in lines] == [
+        20, 20, 20, 20, 20, 0, 0, 0, 0]
+
+
+@assert_no_logs
+def test_float_exclusion_index():
+    page, = render_pages('''
+      <style>
+        body { width: 100px; font: 10px / 10px weasyprint }
+        section { position: relative; top: 5px }
+        div { float: left; width: 20px; height: 15px }
+        p { margin: 0 }
+      </style>
+      <section><div></div></section><p>a a</p>''')
+    html, = page.children
+    body, = html.children
+    section, paragraph = body.children
+    div, = section.children
+    line, = paragraph.children
+    context = LayoutContext(None, lambda **kwargs: None, None, None, None)
+    context.create_block_formatting_context()
+    context.excluded_shapes.append(div)
+    context.excluded_shapes_changed()
+    index = context.exclusion_index()
+    assert index.max_bottom == 20
+
+    # Lines laid out next to the floats don't change the index.
+    line.translate(0, 10)
+    context.excluded_shapes = context.excluded_shapes.copy()
+    index = context.exclusion_index()
+    line.translate(0, 10)
+    assert not relative_positioning(paragraph, (100, 100))
+    assert context.exclusion_index() is index
+
+    # Floats translated by layout change the index.
+    assert relative_positioning(section, (100, 100))
+    context.excluded_shapes_changed()
+    new_index = context.exclusion_index()
+    assert new_index is not index
+    assert new_index.max_bottom == 25
+    assert context.exclusion_index() is new_index
+    context.finish_block_formatting_context()
@@ -1939,3 +1939,36 @@ def test_grid_in_columns_with_break():
     section2, section3 = grid.children
     assert section2.position_y == 0
     assert section3.position_y == 4
+
+
+@assert_no_logs
+@pytest.mark.parametrize('flow', ['row', 'row dense'])
+def test_grid_auto_flow_many_items(flow):
+    page, = render_pages('''
+      <style>
+        article {
+          display: grid;
+          font-family: weasyprint;
+          font-size: 2px;
+          grid-auto-flow: %s;
+          grid-template-columns: 3px 3px 3px;
+          line-height: 1;
+        }
+        div:nth-child(3n+1) { grid-column: span 2 }
+      </style>
+      <article>%s</article>
+    ''' % (flow, '<div>a</div>' * 30))
+    html, = page.children
+    body, = html.children
+    article, = body.children
+    positions = [(div.position_x, div.position_y) for div in article.children]
+    assert positions[:7] == [
+        (0, 0), (6, 0), (0, 2), (3, 2), (0, 4), (3, 4), (0, 6)]
+    if flow == 'row':
+        # The hole left by the previous spanning item is not filled.
+        assert positions[7] == (6, 6)
+        assert article.height == 30
+    else:
+        # The hole left by the previous spanning item is filled.
+        assert positions[7] == (6, 4)
+        assert article.height == 28
@@ -1579,6 +1579,54 @@ def test_margin_boxes_element():
     assert footer3_text == '0 of 3 (3)'
 
 
+@assert_no_logs
+def test_margin_boxes_body_page_counters():
+    pages = render_pages('''
+      <style>
+        @page {
+          margin: 50px;
+          size: 200px;
+          @bottom-center {
+            content: counter(page) ' of ' counter(pages);
+          }
+        }
+        h1 {
+          break-before: page;
+          font-size: 2px;
+          height: 40px;
+        }
+        h1::after {
+          content: counter(page);
+        }
+        p::after {
+          content: counter(pages) ' ' target-counter('#last', page);
+        }
+      </style>
+      <h1>test1</h1>
+      <p></p>
+      <h1>test2</h1>
+      <h1 id="last">test3</h1>
+    ''')
+    for i, page in enumerate(pages, start=1):
+        html, footer = page.children
+        body, = html.children
+        h1 = body.children[0]
+        footer_text = ''.join(
+            getattr(node, 'text', '') for node in footer.descendants())
+        assert footer_text == f'{i} of 3'
+        line, = h1.children
+        _, after = line.children
+        text, = after.children
+        assert text.text == str(i)
+    html, _ = pages[0].children
+    body, = html.children
+    _, p = body.children
+    line, = p.children
+    after, = line.children
+    text, = after.children
+    assert text.text == '3 3'
+
+
 @assert_no_logs
 def test_margin_boxes_running_element():
     pages = render_pages('''
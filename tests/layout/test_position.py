@@ -449,6 +449,29 @@ def test_fixed_positioning_regression_2():
     assert (header.position_x, header.position_y) == (5, 10)
 
 
+@assert_no_logs
+def test_fixed_positioning_many_pages():
+    pages = render_pages('''
+      <style>
+        @page { size: 100px 100px }
+        section { break-after: page }
+        div { position: fixed; top: 10px; left: 15px; width: 20px }
+      </style>
+      <div><p>a</p></div>
+      <section></section><section></section><section></section><section></section>
+    ''')
+    assert len(pages) == 4
+    divs = []
+    for page in pages[1:]:
+        html, = page.children
+        div, body = html.children
+        assert (div.position_x, div.position_y) == (15, 10)
+        p, = div.children
+        assert (p.position_x, p.position_y) == (15, 10)
+        divs.append(div)
+    assert len(set(map(id, divs))) == 3
+
+
 @assert_no_logs
 def test_flex_relative_positioning():
     page, = render_pages('''
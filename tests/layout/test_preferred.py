@@ -93,3 +93,21 @@ def test_preferred_inline_trailing_space_in_nested():
     div, = body.children
     assert div.width == 2
     assert div.height == 2
+
+
+@assert_no_logs
+def test_preferred_page_based_counter():
+    pages = render_pages('''
+      <style>
+        div { font: 2px weasyprint; float: left }
+        div::before { content: counter(pages) }
+        p { break-before: page }
+      </style>
+      <div></div>
+      <p></p><p></p><p></p><p></p><p></p><p></p><p></p><p></p><p></p>
+    ''')
+    assert len(pages) == 10
+    html, = pages[0].children
+    body, = html.children
+    div, = body.children
+    assert div.width == 4
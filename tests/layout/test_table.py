@@ -2311,6 +2311,40 @@ def test_table_page_breaks(html, rows, positions):
     assert rows_position_y == positions
 
 
+@assert_no_logs
+def test_table_page_breaks_many_rows():
+    rows = ['<tr><td></td><td></td></tr>'] * 12
+    rows[6] = '<tr><td></td><td rowspan="2"></td></tr>'
+    rows[7] = '<tr><td></td></tr>'
+    pages = render_pages('''
+      <style>
+        @page { size: 100px }
+        table { table-layout: fixed; width: 100%%; border-spacing: 0 }
+        td { height: 20px; padding: 0 }
+      </style>
+      <table>%s</table>
+    ''' % ''.join(rows))
+    indexes = []
+    for page in pages:
+        html, = page.children
+        body, = html.children
+        table_wrapper, = body.children
+        table, = table_wrapper.children
+        group, = table.children
+        indexes.append([row.index for row in group.children])
+        assert [row.position_y for row in group.children] == [
+            20 * i for i in range(len(group.children))]
+    assert indexes == [[0, 1, 2, 3, 4], [5, 6, 7, 8, 9], [10, 11]]
+    html, = pages[1].children
+    body, = html.children
+    table_wrapper, = body.children
+    table, = table_wrapper.children
+    group, = table.children
+    _, spanning_cell = group.children[1].children
+    assert spanning_cell.rowspan == 2
+    assert spanning_cell.border_height() == 40
+
+
 @assert_no_logs
 def test_table_page_breaks_in_cell():
     page1, page2 = render_pages('''
@@ -2459,6 +2493,43 @@ def test_table_page_breaks_complex_2():
     # TODO: test positions, the place of footer on the first page is wrong.
 
 
+@assert_no_logs
+def test_table_page_breaks_repeated_header_footer():
+    pages = render_pages('''
+      <style>
+        @page { size: 100px }
+        table { border-spacing: 0; font-size: 5px }
+        td { height: 20px; padding: 0 }
+      </style>
+      <table>
+        <thead><tr><td>Header</td></tr></thead>
+        <tbody>%s</tbody>
+        <tfoot><tr><td>Footer</td></tr></tfoot>
+      </table>
+    ''' % ('<tr><td>Row</td></tr>' * 9))
+    assert len(pages) == 3
+    cells = []
+    for page in pages:
+        html, = page.children
+        body, = html.children
+        table_wrapper, = body.children
+        table, = table_wrapper.children
+        header, body, footer = table.children
+        assert header.position_y == 0
+        assert len(body.children) == 3
+        assert footer.position_y == 80
+        for group, text in ((header, 'Header'), (footer, 'Footer')):
+            row, = group.children
+            cell, = row.children
+            line, = cell.children
+            text_box, = line.children
+            assert text_box.text == text
+            assert cell.position_y == group.position_y
+            cells.append(cell)
+    # Headers and footers are different boxes on each page.
+    assert len(set(map(id, cells))) == 6
+
+
 @assert_no_logs
 def test_table_page_break_after():
     page1, page2, page3, page4, page5, page6 = render_pages('''
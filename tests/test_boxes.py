@@ -1221,6 +1221,21 @@ def test_margin_box_string_set_10():
     assert left_text_box.text == '[3]'
 
 
+@assert_no_logs
+def test_margin_box_string_set_absolute():
+    page_1, = render_pages('''
+      <style>
+        @page { @top-center { content: string(text_header) } }
+        p { position: absolute; string-set: text_header content() }
+      </style>
+      <div><p>absolute assignment</p></div>
+    ''')
+    html, top_center = page_1.children
+    line_box, = top_center.children
+    text_box, = line_box.children
+    assert text_box.text == 'absolute assignment'
+
+
 @assert_no_logs
 def test_page_counters():
     """Test page-based counters."""
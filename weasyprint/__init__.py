@@ -308,7 +308,7 @@ class CSS:
                     css, environment_encoding=encoding,
                     protocol_encoding=protocol_encoding)
         self.base_url = base_url
-        self.matcher = matcher or cssselect2.Matcher()
+        self.matcher = matcher or Matcher()
         self.page_rules = [] if page_rules is None else page_rules
         self.layers = [] if layers is None else layers
         counter_style = {} if counter_style is None else counter_style
@@ -374,6 +374,7 @@ class Attachment:
 
 # Work around circular imports.
 from .css import preprocess_stylesheet  # noqa: I001, E402
+from .css.matcher import Matcher  # noqa: E402
 from .html import (  # noqa: E402
     HTML5_UA_COUNTER_STYLE, HTML5_UA_STYLESHEET, HTML5_UA_FORM_STYLESHEET,
     HTML5_PH_STYLESHEET)
@@ -14,10 +14,11 @@ on other functions in this module.
 
 import math
 from collections import namedtuple
-from functools import cached_property
+from functools import partial
 from itertools import groupby
 from logging import DEBUG, WARNING
 from math import inf
+from operator import itemgetter
 
 import cssselect2
 import tinycss2
@@ -32,6 +33,7 @@ from ..urls import URLFetchingError, fetch, get_url_attribute, url_join
 from . import counters, media_queries
 from .computed_values import COMPUTER_FUNCTIONS, PHYSICAL_FUNCTIONS
 from .functions import Function, check_math, check_var
+from .matcher import AncestorFilter, Matcher
 from .properties import INHERITED, INITIAL_NOT_COMPUTED, INITIAL_VALUES, ZERO_PIXELS
 from .units import ANGLE_UNITS, LENGTH_UNITS, RELATIVE_UNITS, to_pixels, to_radians
 from .validation import preprocess_declarations
@@ -55,6 +57,9 @@ PAGE_MARGIN_BOXES = frozenset((
 
 PageSelectorType = namedtuple(
     'PageSelectorType', ['side', 'blank', 'first', 'index', 'name'])
+PropertyInfo = namedtuple('PropertyInfo', [
+    'name', 'custom', 'inherited', 'initial_value', 'initial_computed',
+    'logical_keys', 'computer_function', 'text_decoration'])
 
 
 class StyleFor:
@@ -85,20 +90,43 @@ class StyleFor:
         self._sheets = sheets
         self.font_config = font_config
 
+        # keys: ElementTree Elements whose styles are computed when requested
+        # values: cssselect2 ElementWrapper objects for these elements
+        self._lazy_elements = lazy_elements = {}
+
         PROGRESS_LOGGER.info('Step 3 - Applying CSS')
+
+        # Declarations are grouped by weight into (weight, position, declarations)
+        # tuples. Sorting these tuples gives the order in which declarations
+        # have to be set: declarations with a greater weight take precedence,
+        # then declarations with a greater position take precedence.
+
+        # Collect declarations from style attributes and presentational hints,
+        # with negative positions as they come before declarations from sheets.
         layer_order = inf
         elements_declarations = {}
-        for specificity, element, declarations, base_url in find_style_attributes(
-                html.etree_element, presentational_hints, html.base_url):
-            style = cascaded_styles.setdefault((element, None), {})
+        elements_groups = {}
+        style_attributes = list(find_style_attributes(
+            html.etree_element, presentational_hints, html.base_url))
+        for order, (specificity, element, declarations, base_url) in enumerate(
+                style_attributes, start=-len(style_attributes)):
             elements_declarations[element] = tuple(declarations)
+            weighted_declarations = {}
             for name, values, importance in preprocess_declarations(
                     base_url, declarations):
                 precedence = declaration_precedence('author', importance)
                 weight = (precedence, layer_order, specificity)
-                old_weight = style.get(name, (None, None))[1]
-                if old_weight is None or old_weight <= weight:
-                    style[name] = values, weight
+                weighted_declarations.setdefault(weight, []).append((name, values))
+            position = (-1, specificity, order)
+            elements_groups.setdefault(element, []).extend(
+                (weight, position, declarations)
+                for weight, declarations in weighted_declarations.items())
+
+        # Merge rules of all sheets, in the order of sheets.
+        rule_index = Matcher()
+        for sheet_index, (sheet, origin, sheet_specificity) in enumerate(sheets):
+            rule_index.add_matcher(sheet.matcher, partial(
+                _weighted_rule, sheet_index, sheet, origin, sheet_specificity))
 
         # First, add declarations and set computed styles for "real" elements
         # *in tree order*. Tree order is important so that parents have
@@ -106,27 +134,91 @@ class StyleFor:
 
         # Iterate on all elements, even if there is no cascaded style for them.
         computed_cache = {}
+        ancestors = []
+        ancestor_filter = AncestorFilter()
+
+        # Elements with the same sharing key match the same selectors, they
+        # share their computed style and the cascaded styles of their
+        # pseudo-elements. Elements with style attributes or presentational
+        # hints have their own sharing class, other elements have a class
+        # corresponding to their sharing key.
+        sharing_cache = {}
+        sharing_classes = {}
+        sharing_attributes = rule_index.sharing_attributes
+        unshareable_index = rule_index.unshareable
+        self._lazy_context = (
+            rule_index, elements_groups, html.etree_element, html.base_url)
+
+        # Descendants of "display: none" elements don't generate boxes, their
+        # styles are only computed when they are requested. They are computed
+        # now when rules declare anchors, as targets may point to them.
+        lazy = not target_collector or not any(
+            name == 'anchor' for entry in rule_index.entries()
+            for _, declarations in entry[4][2] for name, _ in declarations)
+        hidden_elements = set()
         for element in html.wrapper_element.iter_subtree():
             etree_element = element.etree_element
             parent = element.parent.etree_element if element.parent else None
+
+            if lazy and parent is not None and (
+                    parent in hidden_elements or
+                    computed_styles[parent, None]['display'] == ('none',)):
+                hidden_elements.add(etree_element)
+                lazy_elements[etree_element] = element
+                # Anchors can also be set by style attributes and
+                # presentational hints.
+                if target_collector and any(
+                        name == 'anchor'
+                        for _, _, declarations in elements_groups.get(
+                            etree_element, ())
+                        for name, _ in declarations):
+                    self._set_lazy_computed_styles(etree_element)
+                    if anchor := computed_styles[etree_element, None]['anchor']:
+                        target_collector.collect_anchor(anchor)
+                continue
+
+            # Keep the ancestors of the current element in the filter.
+            while ancestors and ancestors[-1] is not element.parent:
+                ancestor_filter.remove(ancestors.pop())
+
             parent_id = id(computed_styles[parent, None]) if element.parent else None
             element_declarations = elements_declarations.get(etree_element)
-            selectors_keys = []
-            for sheet, origin, sheet_specificity in sheets:
-                # Add declarations for matching elements.
-                for selector in sheet.matcher.match(element):
-                    specificity, order, pseudo_type, (declarations, layer) = selector
-                    layer_order = inf if layer is None else sheet.layers.index(layer)
-                    selectors_keys.append(
-                        (sheet, specificity, id(declarations), layer_order))
-                    specificity = sheet_specificity or specificity
-                    style = cascaded_styles.setdefault((etree_element, pseudo_type), {})
-                    for name, values, importance in declarations:
-                        precedence = declaration_precedence(origin, importance)
-                        weight = (precedence, layer_order, specificity)
-                        old_weight = style.get(name, (None, None))[1]
-                        if old_weight is None or old_weight <= weight:
-                            style[name] = values, weight
+
+            # Find styles shared with a similar element.
+            sharing_key = None
+            if element_declarations is None:
+                if parent is None:
+                    parent_class = None
+                elif rule_index.shareable_ancestors:
+                    parent_class = sharing_classes[parent]
+                else:
+                    parent_class = parent
+                unshareable_orders = tuple(sorted(
+                    entry[2] for entry in
+                    unshareable_index.match_entries(element, ancestor_filter)))
+                sharing_key = (
+                    parent_class, parent_id, etree_element.tag, element.id,
+                    frozenset(element.classes), tuple(
+                        item for item in etree_element.attrib.items()
+                        if item[0] in sharing_attributes),
+                    unshareable_orders)
+                sharing_classes[etree_element] = sharing_cache.setdefault(
+                    sharing_key, (len(sharing_cache), None, None))[0]
+                _, computed_style, pseudo_styles = sharing_cache[sharing_key]
+                if computed_style is not None:
+                    computed_styles[etree_element, None] = computed_style
+                    for pseudo_type, style in pseudo_styles.items():
+                        cascaded_styles[etree_element, pseudo_type] = style
+                    ancestor_filter.add(element)
+                    ancestors.append(element)
+                    continue
+            else:
+                sharing_classes[etree_element] = etree_element
+
+            # Add declarations for matching elements.
+            selectors_keys, pseudo_styles = _set_cascaded_styles(
+                cascaded_styles, etree_element, elements_groups.get(etree_element, ()),
+                rule_index.match_entries(element, ancestor_filter))
 
             # Store computed styles.
             key = (parent_id, element_declarations, tuple(selectors_keys))
@@ -139,6 +231,13 @@ class StyleFor:
                     etree_element, root=html.etree_element, parent=parent,
                     base_url=html.base_url, target_collector=target_collector)
                 computed_cache[key] = computed_styles[etree_element, None]
+            if sharing_key is not None:
+                sharing_cache[sharing_key] = (
+                    sharing_classes[etree_element],
+                    computed_styles[etree_element, None], pseudo_styles)
+
+            ancestor_filter.add(element)
+            ancestors.append(element)
 
         # Then computed styles for pseudo elements, in any order.
         # Pseudo-elements inherit from their associated element so they come
@@ -161,7 +260,10 @@ class StyleFor:
         self._cascaded_styles.clear()
 
     def __call__(self, element, pseudo_type=None):
-        if style := self._computed_styles.get((element, pseudo_type)):
+        if element in self._lazy_elements:
+            self._set_lazy_computed_styles(element)
+        style = self._computed_styles.get((element, pseudo_type))
+        if style is not None:
             if 'table' in style['display'] and style['border_collapse'] == 'collapse':
                 # Padding does not apply.
                 for side in ('top', 'bottom', 'left', 'right'):
@@ -201,6 +303,35 @@ class StyleFor:
         if target_collector and computed['anchor']:
             target_collector.collect_anchor(computed['anchor'])
 
+    def _set_lazy_computed_styles(self, element):
+        """Set the computed styles of an element skipped in a hidden subtree.
+
+        Styles of the skipped ancestors of ``element`` are set first, as they
+        are needed for inheritance.
+
+        """
+        rule_index, elements_groups, root, base_url = self._lazy_context
+        cascaded_styles = self._cascaded_styles
+        wrappers = []
+        while element in self._lazy_elements:
+            wrapper = self._lazy_elements.pop(element)
+            wrappers.append(wrapper)
+            element = wrapper.parent.etree_element
+        for wrapper in reversed(wrappers):
+            element = wrapper.etree_element
+            _, pseudo_styles = _set_cascaded_styles(
+                cascaded_styles, element, elements_groups.get(element, ()),
+                rule_index.match_entries(wrapper))
+            self.set_computed_styles(
+                element, root=root, parent=wrapper.parent.etree_element,
+                base_url=base_url)
+            for pseudo_type in pseudo_styles:
+                self.set_computed_styles(
+                    element, pseudo_type=pseudo_type, root=root, parent=element,
+                    base_url=base_url)
+            for pseudo_type in (None, *pseudo_styles):
+                cascaded_styles.pop((element, pseudo_type), None)
+
     def add_page_declarations(self, page_type):
         # TODO: use real layer order.
         layer_order = None
@@ -586,6 +717,56 @@ def find_style_attributes(tree, presentational_hints=False, base_url=None):
                     yield parse_declaration('counter-increment:none')
 
 
+def _weighted_rule(sheet_index, sheet, origin, sheet_specificity, specificity,
+                   payload):
+    """Return the cascade key and the declarations of a rule grouped by weight."""
+    declarations, layer = payload
+    layer_order = inf if layer is None else sheet.layers.index(layer)
+    selector_key = (sheet, specificity, id(declarations), layer_order)
+    specificity = sheet_specificity or specificity
+    weighted_declarations = {}
+    for name, values, importance in declarations:
+        precedence = declaration_precedence(origin, importance)
+        weight = (precedence, layer_order, specificity)
+        weighted_declarations.setdefault(weight, []).append((name, values))
+    return selector_key, sheet_index, tuple(weighted_declarations.items())
+
+
+def _set_cascaded_styles(cascaded_styles, element, groups, entries):
+    """Set the cascaded styles of an element and of its pseudo-elements.
+
+    ``groups`` are the declarations of the element's style attribute and
+    presentational hints, ``entries`` are the rule index entries matching the
+    element.
+
+    Return the keys of the matching selectors and the cascaded styles of the
+    pseudo-elements.
+
+    """
+    pseudo_groups = {None: list(groups)}
+    selectors_keys = []
+    entries.sort(key=itemgetter(2))
+    for _, specificity, order, pseudo_type, payload, *_ in entries:
+        selector_key, sheet_index, weighted_declarations = payload
+        selectors_keys.append(selector_key)
+        position = (sheet_index, specificity, order)
+        pseudo_groups.setdefault(pseudo_type, []).extend(
+            (weight, position, declarations)
+            for weight, declarations in weighted_declarations)
+    pseudo_styles = {}
+    for pseudo_type, pseudo_type_groups in pseudo_groups.items():
+        if not pseudo_type_groups:
+            continue
+        pseudo_type_groups.sort()
+        style = cascaded_styles.setdefault((element, pseudo_type), {})
+        for weight, _, declarations in pseudo_type_groups:
+            for name, values in declarations:
+                style[name] = values, weight
+        if pseudo_type is not None:
+            pseudo_styles[pseudo_type] = style
+    return selectors_keys, pseudo_styles
+
+
 def declaration_precedence(origin, importance):
     """Return the precedence for a declaration.
 
@@ -1055,18 +1236,60 @@ def resolve_math(token, computed=None, property_name=None, refer_to=None):
     return resolve_math(token, computed, property_name, refer_to) or token
 
 
+def _property_info(key):
+    """Return the information needed to compute the ``key`` property."""
+    custom = key[:2] == '__'
+    logical_keys = None
+    if logical_function := PHYSICAL_FUNCTIONS.get(key):
+        # TODO: use writing-mode and text-orientation.
+        logical_keys = {}
+        for direction in ('ltr', 'rtl'):
+            logical_key = logical_function(block='ttb', inline=direction)
+            logical_keys[direction] = (logical_key, logical_key.replace('_', '-'))
+    return PropertyInfo(
+        name=key.replace('_', '-'),
+        custom=custom,
+        inherited=key in INHERITED,
+        initial_value=None if custom else INITIAL_VALUES[key],
+        initial_computed=key not in INITIAL_NOT_COMPUTED,
+        logical_keys=logical_keys,
+        computer_function=COMPUTER_FUNCTIONS.get(key),
+        text_decoration=key[:16] == 'text_decoration_')
+
+
+# Information about properties, custom properties are not included.
+PROPERTY_INFO = {key: _property_info(key) for key in INITIAL_VALUES}
+
+
+def property_info(key):
+    """Return the information needed to compute the ``key`` property."""
+    if (info := PROPERTY_INFO.get(key)) is None:
+        if key[:2] != '__':
+            raise KeyError(key)
+        # Custom properties depend on documents, don't keep their information.
+        info = _property_info(key)
+    return info
+
+
 class Style(dict):
     """Abstract class for all style dictionaries."""
+    __slots__ = ('_anonymous_style', 'cache', 'font_config', 'specified')
     parent_style = None
     is_root_element = False
 
-    @cached_property
+    @property
     def anonymous_style(self):
-        return AnonymousStyle(self)
+        try:
+            return self._anonymous_style
+        except AttributeError:
+            self._anonymous_style = AnonymousStyle(self)
+            return self._anonymous_style
 
 
 class InitialStyle(Style):
     """Dummy computed style used to store initial values."""
+    __slots__ = ()
+
     def __init__(self, font_config):
         self.specified = self
         self.cache = {}
@@ -1079,6 +1302,8 @@ class InitialStyle(Style):
 
 class AnonymousStyle(Style):
     """Computed style used for anonymous boxes."""
+    __slots__ = ('parent_style', 'root_style')
+
     def __init__(self, parent_style):
         # border-*-style is none, so border-width computes to zero.
         # Other than that, properties that would need computing are
@@ -1102,27 +1327,32 @@ class AnonymousStyle(Style):
         return copy
 
     def __missing__(self, key):
-        if key in INHERITED or key[:2] == '__':
+        info = property_info(key)
+        if info.inherited or info.custom:
             value = self[key] = self.parent_style[key]
         elif key == 'page':
             # page is not inherited but taken from the ancestor if 'auto'
             value = self[key] = self.parent_style[key]
-        elif key[:16] == 'text_decoration_':
+        elif info.text_decoration:
             value = self[key] = text_decoration(
-                key, INITIAL_VALUES[key], self.parent_style[key], cascaded=False)
+                key, info.initial_value, self.parent_style[key], cascaded=False)
         else:
-            value = INITIAL_VALUES[key]
-            if key in INITIAL_NOT_COMPUTED:
-                # Value not computed yet: compute.
-                value = self[key] = COMPUTER_FUNCTIONS[key](self, key, value)
-            else:
+            value = info.initial_value
+            if info.initial_computed:
                 # The value is the same as when computed.
                 self[key] = value
+            else:
+                # Value not computed yet: compute.
+                value = self[key] = info.computer_function(self, key, value)
         return value
 
 
 class ComputedStyle(Style):
     """Computed style used for non-anonymous boxes."""
+    __slots__ = (
+        'base_url', 'cascaded', 'initial_page_sizes', 'is_root_element',
+        'parent_style', 'pseudo_type', 'root_style')
+
     def __init__(self, parent_style, cascaded, pseudo_type, root_style, base_url,
                  font_config, initial_page_sizes):
         self.specified = {}
@@ -1153,29 +1383,30 @@ class ComputedStyle(Style):
             self['float']
 
         parent_style = self.parent_style
+        info = property_info(key)
+        cascaded = self.cascaded
 
-        if key in self.cascaded:
+        if key in cascaded:
             # Property defined in cascaded properties.
-            value, weight = self.cascaded[key]
+            value, weight = cascaded[key]
             pending = isinstance(value, Pending)
         else:
             # Property not defined in cascaded properties, define as inherited
             # or initial value.
-            if key in INHERITED or key[:2] == '__':
+            if info.inherited or info.custom:
                 value = 'inherit'
             else:
                 value = 'initial'
             weight = (0, 0, (0, 0, 0))
             pending = False
 
-        wanted_key = key.replace('_', '-')
-        if logical_function := PHYSICAL_FUNCTIONS.get(key):
-            # TODO: use writing-mode and text-orientation.
-            logical_key = logical_function(block='ttb', inline=self['direction'])
-            if logical_key in self.cascaded:
-                logical_value, logical_weight = self.cascaded[logical_key]
+        wanted_key = info.name
+        if info.logical_keys:
+            logical_key, logical_name = info.logical_keys[self['direction']]
+            if logical_key in cascaded:
+                logical_value, logical_weight = cascaded[logical_key]
                 if logical_weight >= weight:
-                    wanted_key = logical_key.replace('_', '-')
+                    wanted_key = logical_name
                     value = logical_value
                     pending = isinstance(value, Pending)
 
@@ -1197,33 +1428,33 @@ class ComputedStyle(Style):
             try:
                 value = value.solve(solved_tokens, wanted_key, self.base_url)
             except InvalidValues:
-                if key in INHERITED and parent_style is not None:
+                if info.inherited and parent_style is not None:
                     # Values in parent_style are already computed.
                     self[key] = value = parent_style[key]
-                elif key[:2] == '__':
+                elif info.custom:
                     value = None
                 else:
-                    value = INITIAL_VALUES[key]
-                    if key not in INITIAL_NOT_COMPUTED:
+                    value = info.initial_value
+                    if info.initial_computed:
                         # The value is the same as when computed.
                         self[key] = value
 
         if value == 'initial':
-            value = [] if key[:2] == '__' else INITIAL_VALUES[key]
-            if key not in INITIAL_NOT_COMPUTED:
+            value = [] if info.custom else info.initial_value
+            if info.initial_computed:
                 # The value is the same as when computed.
                 self[key] = value
         elif value == 'inherit':
             # Values in parent_style are already computed.
             self[key] = value = parent_style[key]
 
-        if key[:16] == 'text_decoration_' and parent_style is not None:
+        if info.text_decoration and parent_style is not None:
             # Text decorations are not inherited but propagated. See
             # https://www.w3.org/TR/css-text-decor-3/#line-decoration.
-            if key in COMPUTER_FUNCTIONS:
-                value = COMPUTER_FUNCTIONS[key](self, key, value)
+            if info.computer_function:
+                value = info.computer_function(self, key, value)
             self[key] = text_decoration(
-                key, value, parent_style[key], key in self.cascaded)
+                key, value, parent_style[key], key in cascaded)
         elif key == 'page' and value == 'auto':
             # The page property does not inherit. However, if the page value on
             # an element is auto, then its used value is the value specified on
@@ -1256,18 +1487,17 @@ class ComputedStyle(Style):
                             solved_tokens.append(token)
                     else:
                         solved_tokens.append(value)
-                original_key = key.replace('_', '-')
-                value = validate_non_shorthand(solved_tokens, original_key)[0][1]
+                value = validate_non_shorthand(solved_tokens, info.name)[0][1]
             except Exception:
                 LOGGER.warning(
                     'Invalid math function at %d:%d: %s',
                     function.source_line, function.source_column, function.serialize())
-                if key in INHERITED and parent_style is not None:
+                if info.inherited and parent_style is not None:
                     # Values in parent_style are already computed.
                     self[key] = value = parent_style[key]
                 else:
-                    value = INITIAL_VALUES[key]
-                    if key not in INITIAL_NOT_COMPUTED:
+                    value = [] if info.custom else info.initial_value
+                    if info.initial_computed:
                         # The value is the same as when computed.
                         self[key] = value
 
@@ -1275,9 +1505,9 @@ class ComputedStyle(Style):
             # Value already computed and saved: return.
             return self[key]
 
-        if key in COMPUTER_FUNCTIONS:
+        if info.computer_function:
             # Value not computed yet: compute.
-            value = COMPUTER_FUNCTIONS[key](self, key, value)
+            value = info.computer_function(self, key, value)
 
         self[key] = value
         return value
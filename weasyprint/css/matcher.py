@@ -0,0 +1,340 @@
+"""Match selectors against elements.
+
+Selectors are stored in a :class:`Matcher`, that quickly rejects selectors
+requiring ancestors that can't be found in an :class:`AncestorFilter`. Matchers
+of multiple stylesheets can be merged, so that elements are matched only once.
+
+Matchers also know which selectors only depend on the element and its
+ancestors, so that elements with the same tag, id, classes, attributes and
+ancestors can share the result of matching.
+
+"""
+
+import cssselect2
+from cssselect2 import parser
+from cssselect2.compiler import CompiledSelector
+from webencodings import ascii_lower
+
+# Number of bits used to get counting Bloom filter indexes.
+FILTER_BITS = 12
+FILTER_MASK = (1 << FILTER_BITS) - 1
+
+# Pseudo-classes only depending on the element, with the attributes they read.
+ELEMENT_PSEUDO_CLASSES = {
+    'link': ('href',),
+    'any-link': ('href',),
+    'local-link': ('href',),
+    'checked': ('checked', 'selected', 'type'),
+    'root': (),
+    'scope': (),
+}
+LANG_ATTRIBUTES = ('lang', '{http://www.w3.org/XML/1998/namespace}lang')
+
+
+def _filter_indexes(key):
+    """Return the counting Bloom filter indexes corresponding to ``key``."""
+    key_hash = hash(key)
+    return key_hash & FILTER_MASK, (key_hash >> FILTER_BITS) & FILTER_MASK
+
+
+def _element_keys(element):
+    """Yield the keys of ``element`` that can be required by selectors."""
+    yield ('tag', ascii_lower(element.local_name))
+    if element.id is not None:
+        yield ('id', element.id)
+    for class_name in element.classes:
+        yield ('class', class_name)
+
+
+def _ancestor_indexes(parsed_tree):
+    """Return Bloom filter indexes of keys required on subject’s ancestors.
+
+    Only keys of compound selectors separated from the subject by descendant
+    and child combinators are returned. Other ones may match siblings or are
+    too complex to be collected, they are ignored.
+
+    """
+    indexes = set()
+    node = parsed_tree
+    while isinstance(node, parser.CombinedSelector):
+        left = node.left
+        if node.combinator in (' ', '>'):
+            compound = left.right if isinstance(left, parser.CombinedSelector) else left
+            for simple_selector in compound.simple_selectors:
+                if isinstance(simple_selector, parser.LocalNameSelector):
+                    key = ('tag', simple_selector.lower_local_name)
+                elif isinstance(simple_selector, parser.IDSelector):
+                    key = ('id', simple_selector.ident)
+                elif isinstance(simple_selector, parser.ClassSelector):
+                    key = ('class', simple_selector.class_name)
+                else:
+                    continue
+                indexes.update(_filter_indexes(key))
+        node = left
+    return tuple(sorted(indexes))
+
+
+def _simple_selector_sharing(simple_selector, attributes):
+    """Return how ``simple_selector`` can be shared between elements.
+
+    The first returned boolean is ``True`` when the selector only depends on
+    the tag, id, classes and ``attributes`` of the tested element. The second
+    one is ``False`` when nested selectors depend on other things than the
+    element and its ancestors.
+
+    """
+    if isinstance(simple_selector, (
+            parser.LocalNameSelector, parser.NamespaceSelector,
+            parser.IDSelector, parser.ClassSelector)):
+        return True, True
+    elif isinstance(simple_selector, parser.AttributeSelector):
+        namespace = simple_selector.namespace
+        for name in (simple_selector.name, simple_selector.lower_name):
+            attributes.add(f'{{{namespace}}}{name}' if namespace else name)
+        return True, True
+    elif isinstance(simple_selector, parser.PseudoClassSelector):
+        if simple_selector.name in ELEMENT_PSEUDO_CLASSES:
+            attributes.update(ELEMENT_PSEUDO_CLASSES[simple_selector.name])
+            return True, True
+        return False, True
+    elif isinstance(simple_selector, parser.FunctionalPseudoClassSelector):
+        if simple_selector.name == 'lang':
+            attributes.update(LANG_ATTRIBUTES)
+            return True, True
+        return False, True
+    elif isinstance(simple_selector, (
+            parser.NegationSelector, parser.MatchesAnySelector,
+            parser.SpecificityAdjustmentSelector)):
+        shareable = shareable_ancestors = True
+        for selector in simple_selector.selector_list:
+            sharing = _selector_sharing(selector.parsed_tree, attributes)
+            shareable = shareable and sharing[0]
+            shareable_ancestors = shareable_ancestors and sharing[1]
+        return shareable, shareable_ancestors
+    else:
+        return False, True
+
+
+def _selector_sharing(parsed_tree, attributes):
+    """Return how the selector can be shared between elements.
+
+    The first returned boolean is ``True`` when the tests on the subject only
+    depend on its tag, id, classes and ``attributes``. The second one is
+    ``True`` when tests on the ancestors only depend on the same values.
+
+    """
+    shareable = shareable_ancestors = subject = True
+    node = parsed_tree
+    while True:
+        if isinstance(node, parser.CombinedSelector):
+            compound = node.right
+        else:
+            compound = node
+        for simple_selector in compound.simple_selectors:
+            element_only, ancestors_only = _simple_selector_sharing(
+                simple_selector, attributes)
+            if subject:
+                shareable = shareable and element_only
+            else:
+                shareable_ancestors = shareable_ancestors and element_only
+            shareable_ancestors = shareable_ancestors and ancestors_only
+        if not isinstance(node, parser.CombinedSelector):
+            return shareable, shareable_ancestors
+        if node.combinator in ('+', '~'):
+            # Siblings are not the same for elements sharing their styles.
+            if subject:
+                shareable = False
+            else:
+                shareable_ancestors = False
+        else:
+            subject = False
+        node = node.left
+
+
+def compile_selector_list(prelude):
+    """Compile a list of selectors.
+
+    Like :func:`cssselect2.compile_selector_list`, but compiled selectors also
+    have ``ancestor_indexes``, ``shareable``, ``shareable_ancestors`` and
+    ``sharing_attributes`` attributes, used by :class:`Matcher`.
+
+    """
+    compiled_selectors = []
+    for parsed_selector in parser.parse(prelude):
+        compiled_selector = CompiledSelector(parsed_selector)
+        parsed_tree = parsed_selector.parsed_tree
+        compiled_selector.ancestor_indexes = _ancestor_indexes(parsed_tree)
+        attributes = set()
+        compiled_selector.shareable, compiled_selector.shareable_ancestors = (
+            _selector_sharing(parsed_tree, attributes))
+        compiled_selector.sharing_attributes = frozenset(attributes)
+        compiled_selectors.append(compiled_selector)
+    return compiled_selectors
+
+
+class AncestorFilter:
+    """Counting Bloom filter of the ancestors of the current element.
+
+    Elements have to be added when their descendants are matched, and removed
+    when all their descendants have been matched.
+
+    """
+    def __init__(self):
+        self._counts = [0] * (FILTER_MASK + 1)
+
+    def add(self, element):
+        """Add the keys of ``element``."""
+        for key in _element_keys(element):
+            for index in _filter_indexes(key):
+                self._counts[index] += 1
+
+    def remove(self, element):
+        """Remove the keys of ``element``."""
+        for key in _element_keys(element):
+            for index in _filter_indexes(key):
+                self._counts[index] -= 1
+
+    def may_match(self, indexes):
+        """Return whether all ``indexes`` may correspond to ancestors’ keys."""
+        counts = self._counts
+        for index in indexes:
+            if not counts[index]:
+                return False
+        return True
+
+
+class Matcher(cssselect2.Matcher):
+    """Selectors storage that can reject selectors with an ancestor filter.
+
+    Selectors whose result can't be shared between elements with the same
+    tag, id, classes, ``sharing_attributes`` and ancestors are also stored in
+    the ``unshareable`` matcher.
+
+    """
+    def __init__(self, unshareable=True):
+        super().__init__()
+        self.unshareable = Matcher(unshareable=False) if unshareable else None
+        self.sharing_attributes = set()
+        self.shareable_ancestors = True
+
+    def add_selector(self, selector, payload):
+        self.order += 1
+
+        if selector.never_matches:
+            return
+
+        entry = (
+            selector.test, selector.specificity, self.order, selector.pseudo_element,
+            payload, getattr(selector, 'ancestor_indexes', ()),
+            getattr(selector, 'shareable', False))
+        if selector.id is not None:
+            self._add_entry('id_selectors', entry, selector.id)
+        elif selector.class_name is not None:
+            self._add_entry('class_selectors', entry, selector.class_name)
+        elif selector.local_name is not None:
+            self._add_entry(
+                'lower_local_name_selectors', entry, selector.lower_local_name)
+        elif selector.namespace is not None:
+            self._add_entry('namespace_selectors', entry, selector.namespace)
+        elif selector.requires_lang_attr:
+            self._add_entry('lang_attr_selectors', entry)
+        else:
+            self._add_entry('other_selectors', entry)
+
+        self.sharing_attributes.update(getattr(selector, 'sharing_attributes', ()))
+        if not getattr(selector, 'shareable_ancestors', False):
+            self.shareable_ancestors = False
+
+    def add_matcher(self, matcher, get_payload):
+        """Add the selectors stored in another ``matcher``.
+
+        ``get_payload`` is called with the specificity and the payload of each
+        selector, and returns the payload stored in this matcher. Selectors are
+        ordered after the ones already stored.
+
+        """
+        def entry(test, specificity, order, pseudo, payload, indexes, shareable):
+            return (
+                test, specificity, self.order + order, pseudo,
+                get_payload(specificity, payload), indexes, shareable)
+
+        for name in (
+                'id_selectors', 'class_selectors', 'lower_local_name_selectors',
+                'namespace_selectors'):
+            for key, selectors in getattr(matcher, name).items():
+                for selector in selectors:
+                    self._add_entry(name, entry(*selector), key)
+        for name in ('lang_attr_selectors', 'other_selectors'):
+            for selector in getattr(matcher, name):
+                self._add_entry(name, entry(*selector))
+        self.order += matcher.order
+        self.sharing_attributes.update(matcher.sharing_attributes)
+        if not matcher.shareable_ancestors:
+            self.shareable_ancestors = False
+
+    def entries(self):
+        """Yield the entries of all the stored selectors."""
+        for name in (
+                'id_selectors', 'class_selectors', 'lower_local_name_selectors',
+                'namespace_selectors'):
+            for selectors in getattr(self, name).values():
+                yield from selectors
+        yield from self.lang_attr_selectors
+        yield from self.other_selectors
+
+    def _add_entry(self, name, entry, key=None):
+        """Add ``entry`` to the ``name`` selectors, in the ``key`` bucket."""
+        selectors = getattr(self, name)
+        if key is None:
+            selectors.append(entry)
+        else:
+            selectors.setdefault(key, []).append(entry)
+        if self.unshareable is not None and not entry[6]:
+            self.unshareable._add_entry(name, entry, key)
+
+    def match(self, element, ancestor_filter=None):
+        """Match selectors against the given element.
+
+        If ``ancestor_filter`` is given, it must include the ancestors of
+        ``element``, and is used to quickly reject impossible selectors.
+
+        """
+        relevant_selectors = [
+            (specificity, order, pseudo, payload)
+            for _, specificity, order, pseudo, payload, *_
+            in self.match_entries(element, ancestor_filter)]
+        relevant_selectors.sort()
+        return relevant_selectors
+
+    def match_entries(self, element, ancestor_filter=None):
+        """Return unsorted entries of selectors matching ``element``.
+
+        Entries are ``(test, specificity, order, pseudo, payload, indexes,
+        shareable)`` tuples.
+
+        """
+        entries = []
+        for selectors in self._relevant_selectors(element):
+            for entry in selectors:
+                if ancestor_filter is not None:
+                    if not ancestor_filter.may_match(entry[5]):
+                        continue
+                if entry[0](element):
+                    entries.append(entry)
+        return entries
+
+    def _relevant_selectors(self, element):
+        """Yield lists of selectors that may match ``element``."""
+        if element.id is not None and element.id in self.id_selectors:
+            yield self.id_selectors[element.id]
+        for class_name in element.classes:
+            if class_name in self.class_selectors:
+                yield self.class_selectors[class_name]
+        lower_name = ascii_lower(element.local_name)
+        if lower_name in self.lower_local_name_selectors:
+            yield self.lower_local_name_selectors[lower_name]
+        if element.namespace_url in self.namespace_selectors:
+            yield self.namespace_selectors[element.namespace_url]
+        if 'lang' in element.etree_element.attrib:
+            yield self.lang_attr_selectors
+        yield self.other_selectors
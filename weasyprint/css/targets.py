@@ -6,8 +6,6 @@ targeted anchors has been done.
 
 """
 
-import copy
-
 from ..logger import LOGGER
 from ..urls import get_url_tuple
 
@@ -77,6 +75,14 @@ class TargetCollector:
         self.target_lookup_items = {}
         self.counter_lookup_items = {}
 
+        # Lists of (css_token, counter_lookup_item) by source box, used to find
+        # the items of boxes with a ``missing_link`` after pagination
+        self.box_counter_lookup_items = {}
+
+        # Lists of counter_lookup_items of ``content`` by targeted anchor name,
+        # used to find the items to update when anchors' page counters change
+        self.anchor_counter_lookup_items = {}
+
         # When collecting is True, compute_content_list() collects missing
         # page counters in CounterLookupItems. Otherwise, it mixes in the
         # TargetLookupItem's cached_page_counter_values.
@@ -142,9 +148,7 @@ class TargetCollector:
             # Store the counter_values in the target_box like
             # compute_content_list does.
             if target_box.cached_counter_values is None:
-                target_box.cached_counter_values = {
-                    key: value.copy() for key, value
-                    in target_counter_values.items()}
+                target_box.cached_counter_values = target_counter_values.copy()
 
     def collect_missing_counters(self, parent_box, css_token,
                                  parse_again_function, missing_counters,
@@ -165,11 +169,18 @@ class TargetCollector:
         if missing_counters or missing_target_counters:
             if parent_box.missing_link is None:
                 parent_box.missing_link = parent_box
+            if (parent_box, css_token) in self.counter_lookup_items:
+                return
             counter_lookup_item = CounterLookupItem(
                 parse_again_function, missing_counters,
                 missing_target_counters)
-            self.counter_lookup_items.setdefault(
-                (parent_box, css_token), counter_lookup_item)
+            self.counter_lookup_items[parent_box, css_token] = counter_lookup_item
+            self.box_counter_lookup_items.setdefault(parent_box, []).append(
+                (css_token, counter_lookup_item))
+            if css_token == 'content':
+                for anchor_name in missing_target_counters:
+                    self.anchor_counter_lookup_items.setdefault(
+                        anchor_name, []).append(counter_lookup_item)
 
     def check_pending_targets(self):
         """Check pending targets if needed."""
@@ -185,49 +196,49 @@ class TargetCollector:
                                    page_maker_index, page_maker):
         """Store target's current ``page_maker_index`` and page counter values.
 
-        Eventually update associated targeting boxes.
+        Eventually update associated targeting boxes. Return whether the content
+        of targeting boxes has been updated.
 
         """
+        content_changed = False
+
         # Only store page counters when paginating
         if self.collecting:
-            return
+            return content_changed
 
         item = self.target_lookup_items.get(anchor_name)
         if item and item.state == 'up-to-date':
             item.page_maker_index = page_maker_index
-            if item.cached_page_counter_values != page_counter_values:
-                item.cached_page_counter_values = copy.deepcopy(
-                    page_counter_values)
+            previous_values = item.cached_page_counter_values
+            if previous_values != page_counter_values:
+                item.cached_page_counter_values = page_counter_values.copy()
 
                 # Spread the news: update boxes affected by a change in the
                 # anchor's page counter values.
-                for (_, css_token), item in self.counter_lookup_items.items():
-                    # Only update items that need counters in their content
-                    if css_token != 'content':
-                        continue
-
-                    # Don't update if item has no missing target counter
-                    missing_counters = item.missing_target_counters.get(
-                        anchor_name)
-                    if missing_counters is None:
-                        continue
-
+                counter_lookups = self.anchor_counter_lookup_items.get(anchor_name, ())
+                for counter_lookup in counter_lookups:
                     # Pending marker for remake_page
-                    if (item.page_maker_index is None or
-                            item.page_maker_index >= len(page_maker)):
-                        item.pending = True
+                    if (counter_lookup.page_maker_index is None or
+                            counter_lookup.page_maker_index >= len(page_maker)):
+                        counter_lookup.pending = True
                         continue
 
-                    # TODO: Is the item at all interested in the new
-                    # page_counter_values? It probably is and this check is a
-                    # brake.
+                    # Only update items interested in the changed counters
+                    missing_counters = (
+                        counter_lookup.missing_target_counters[anchor_name])
                     for counter_name in missing_counters:
                         counter_value = page_counter_values.get(counter_name)
-                        if counter_value is not None:
+                        if counter_value is None:
+                            continue
+                        if counter_value != previous_values.get(counter_name):
                             remake_state = (
-                                page_maker[item.page_maker_index][-1])
+                                page_maker[counter_lookup.page_maker_index][-1])
                             remake_state['content_changed'] = True
-                            item.parse_again(item.cached_page_counter_values)
+                            counter_lookup.parse_again(
+                                counter_lookup.cached_page_counter_values)
+                            content_changed = True
                             break
                     # Hint: the box's own cached page counters trigger a
                     # separate 'content_changed'.
+
+        return content_changed
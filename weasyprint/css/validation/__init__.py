@@ -1,10 +1,11 @@
 """Validate properties, expanders and descriptors."""
 
-from cssselect2 import SelectorError, compile_selector_list
+from cssselect2 import SelectorError
 from tinycss2 import parse_blocks_contents, serialize
 from tinycss2.ast import FunctionBlock, IdentToken, LiteralToken, WhitespaceToken
 
 from ... import LOGGER
+from ..matcher import compile_selector_list
 from ..tokens import InvalidValues, remove_whitespace
 from .expanders import EXPANDERS
 from .properties import PREFIX, PROPRIETARY, UNSTABLE, validate_non_shorthand
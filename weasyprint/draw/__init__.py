@@ -520,6 +520,10 @@ def draw_collapsed_borders(stream, table):
             return y + body_rows_offset
 
     segments = []
+    # Last segment of each line, with the index of the cell following it.
+    line_ends = {}
+    # Last border added for each score, with the number of times it changed.
+    score_borders = {}
 
     def half_max_width(border_list, yx_pairs, vertical=True):
         result = 0
@@ -534,12 +538,37 @@ def draw_collapsed_borders(stream, table):
                 result = max(result, width)
         return result / 2
 
+    def add_segment(line, index, border, start, end):
+        # Merge segments following each other on the same line with the same
+        # border, so that long runs are drawn at once. Dashes and dots are not
+        # merged, as their pattern depends on the length of the segment.
+        # Segments with the same score are painted in the order they are added,
+        # they are not merged if a different border with the same score has
+        # been added in between, as it would then be painted in another order.
+        score, (style, width, color) = border
+        last_border, changes = score_borders.get(score, (None, 0))
+        if border != last_border:
+            changes += 1
+            score_borders[score] = (border, changes)
+        if (previous := line_ends.get(line)) is not None:
+            previous_index, segment = previous
+            mergeable = (
+                previous_index == index and style not in ('dashed', 'dotted') and
+                segment[:4] == [score, style, width, color] and segment[7] == changes)
+            if mergeable:
+                segment[5] = end
+                line_ends[line] = (index + 1, segment)
+                return
+        segment = [score, style, width, color, start, end, line, changes]
+        segments.append(segment)
+        line_ends[line] = (index + 1, segment)
+
     def add_vertical(x, y):
         yy = row_number(y, horizontal=False)
-        score, (style, width, color) = vertical_borders[yy][x]
+        border = vertical_borders[yy][x]
+        _, (_, width, color) = border
         if width == 0 or color.alpha == 0:
             return
-        pos_x = column_positions[x]
         pos_y1 = row_positions[y]
         if y != 0 or not table.skip_cell_border_top:
             pos_y1 -= half_max_width(
@@ -548,8 +577,7 @@ def draw_collapsed_borders(stream, table):
         if y != grid_height - 1 or not table.skip_cell_border_bottom:
             pos_y2 += half_max_width(
                 horizontal_borders, [(y + 1, x - 1), (y + 1, x)], vertical=False)
-        segments.append((
-            score, style, width, color, 'left', (pos_x, pos_y1, 0, pos_y2 - pos_y1)))
+        add_segment(('left', column_positions[x]), y, border, pos_y1, pos_y2)
 
     def add_horizontal(x, y):
         if y == 0 and table.skip_cell_border_top:
@@ -557,16 +585,15 @@ def draw_collapsed_borders(stream, table):
         if y == grid_height and table.skip_cell_border_bottom:
             return
         yy = row_number(y, horizontal=True)
-        score, (style, width, color) = horizontal_borders[yy][x]
+        border = horizontal_borders[yy][x]
+        _, (_, width, color) = border
         if width == 0 or color.alpha == 0:
             return
-        pos_y = row_positions[y]
         shift_before = half_max_width(vertical_borders, [(y - 1, x), (y, x)])
         shift_after = half_max_width(vertical_borders, [(y - 1, x + 1), (y, x + 1)])
         pos_x1 = column_positions[x] - shift_before
         pos_x2 = column_positions[x + 1] + shift_after
-        segments.append((
-            score, style, width, color, 'top', (pos_x1, pos_y, pos_x2 - pos_x1, 0)))
+        add_segment(('top', row_positions[y]), x, border, pos_x1, pos_x2)
 
     for x in range(grid_width):
         add_horizontal(x, 0)
@@ -579,12 +606,14 @@ def draw_collapsed_borders(stream, table):
     # Sort bigger scores last (painted later, on top).
     segments.sort(key=operator.itemgetter(0))
 
-    for segment in segments:
-        _, style, width, color, side, border_box = segment
-        bx, by, bw, bh = border_box
+    for _, style, width, color, start, end, (side, position), _ in segments:
         color = styled_color(style, color, side)
+        if side == 'left':
+            x1, y1, x2, y2 = position, start, position, end
+        else:
+            x1, y1, x2, y2 = start, position, end, position
         with stream.artifact(), stream.stacked():
-            draw_line(stream, bx, by, bx + bw, by + bh, width, style, color)
+            draw_line(stream, x1, y1, x2, y2, width, style, color)
 
 
 def draw_replacedbox(stream, box):
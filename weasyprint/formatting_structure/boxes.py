@@ -82,6 +82,11 @@ class Box:
     missing_link = None
     link_annotation = None
     force_fragmentation = False
+    first_letter_style = None
+    first_line_style = None
+
+    # Sides whose decoration has been removed, replaced when modified.
+    remove_decoration_sides = frozenset()
 
     # Default, overriden on some subclasses
     def all_children(self):
@@ -89,21 +94,24 @@ class Box:
 
     def descendants(self, placeholders=False):
         """A flat generator for a box, its children and descendants."""
+        # Use a stack of iterators instead of recursive generators, so that
+        # yielding a box doesn't depend on its depth.
         yield self
-        for child in self.children:
-            if placeholders or isinstance(child, Box):
-                yield from child.descendants(placeholders)
-            else:
+        stack = [iter(self.children)]
+        while stack:
+            for child in stack[-1]:
                 yield child
+                if placeholders or isinstance(child, Box):
+                    stack.append(iter(child.children))
+                    break
+            else:
+                stack.pop()
 
     def __init__(self, element_tag, style, element):
         self.element_tag = element_tag
         self.element = element
         self.style = style
-        self.remove_decoration_sides = set()
         self.children = []
-        self.first_letter_style = None
-        self.first_line_style = None
 
     def __repr__(self):
         return f'<{type(self).__name__} {self.element_tag}>'
@@ -367,7 +375,7 @@ class ParentBox(Box):
 
     def _reset_spacing(self, side):
         """Set to 0 the margin, padding and border of ``side``."""
-        self.remove_decoration_sides.add(side)
+        self.remove_decoration_sides = self.remove_decoration_sides | {side}
         setattr(self, f'margin_{side}', 0)
         setattr(self, f'padding_{side}', 0)
         setattr(self, f'border_{side}_width', 0)
@@ -387,7 +395,7 @@ class ParentBox(Box):
 
         # Clear and reset removed decorations as we don't want to keep the
         # previous data, for example when a box is split between two pages.
-        self.remove_decoration_sides = set()
+        self.remove_decoration_sides = frozenset()
 
         return new_box
 
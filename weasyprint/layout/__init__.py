@@ -19,6 +19,7 @@ from ..logger import PROGRESS_LOGGER
 from .absolute import absolute_box_layout, absolute_layout
 from .background import layout_backgrounds
 from .block import block_level_layout
+from .float import ExclusionIndex
 from .page import make_all_pages, make_margin_boxes
 
 
@@ -75,29 +76,46 @@ def initialize_page_maker(context, root_box):
         resume_at, next_page, right_page, page_state, remake_state))
 
 
-def layout_fixed_boxes(context, pages, containing_page):
-    """Lay out and yield fixed boxes of ``pages`` on ``containing_page``."""
-    for page in pages:
-        for box in page.fixed_boxes:
-            # As replaced boxes are never copied during layout, ensure that we
-            # have different boxes (with a possibly different layout) for
-            # each pages.
-            if isinstance(box, boxes.ReplacedBox):
-                box = box.copy()
-            # Absolute boxes in fixed boxes are rendered as fixed boxes'
-            # children, even when they are fixed themselves.
-            absolute_boxes = []
-            absolute_box, _ = absolute_box_layout(
-                context, box, containing_page, absolute_boxes,
+def layout_fixed_boxes(context, fixed_boxes, containing_page, layouts):
+    """Lay out and yield ``fixed_boxes`` on ``containing_page``.
+
+    Each fixed box is laid out once for each page geometry. Laid out boxes are
+    stored in ``layouts``, and copies of these boxes are yielded for all the
+    pages with the same geometry.
+
+    """
+    geometry = (
+        containing_page.content_box_x(), containing_page.content_box_y(),
+        containing_page.width, containing_page.height)
+    for box in fixed_boxes:
+        key = (box, *geometry)
+        if key not in layouts:
+            layouts[key] = tuple(_layout_fixed_box(context, box, containing_page))
+        # Boxes are copied, as the same box can't be drawn on multiple pages.
+        for fixed_box in layouts[key]:
+            yield fixed_box.deepcopy()
+
+
+def _layout_fixed_box(context, box, containing_page):
+    """Lay out and yield fixed ``box`` and its absolute descendants."""
+    # As replaced boxes are never copied during layout, ensure that the
+    # original box is not modified.
+    if isinstance(box, boxes.ReplacedBox):
+        box = box.copy()
+    # Absolute boxes in fixed boxes are rendered as fixed boxes' children,
+    # even when they are fixed themselves.
+    absolute_boxes = []
+    absolute_box, _ = absolute_box_layout(
+        context, box, containing_page, absolute_boxes,
+        bottom_space=-inf, skip_stack=None)
+    yield absolute_box
+    while absolute_boxes:
+        new_absolute_boxes = []
+        for box in absolute_boxes:
+            absolute_layout(
+                context, box, containing_page, new_absolute_boxes,
                 bottom_space=-inf, skip_stack=None)
-            yield absolute_box
-            while absolute_boxes:
-                new_absolute_boxes = []
-                for box in absolute_boxes:
-                    absolute_layout(
-                        context, box, containing_page, new_absolute_boxes,
-                        bottom_space=-inf, skip_stack=None)
-                absolute_boxes = new_absolute_boxes
+        absolute_boxes = new_absolute_boxes
 
 
 def layout_document(html, root_box, context, max_loops=8):
@@ -131,21 +149,23 @@ def layout_document(html, root_box, context, max_loops=8):
         pages = list(make_all_pages(context, root_box, html, pages))
         actual_total_pages = len(pages)
 
-        # Check whether another round is required
-        reloop_content = False
-        reloop_pages = False
+        # Check whether another round is required. Only pages whose content
+        # depends on the total number of pages are remade when it changes,
+        # margin boxes are laid out after pagination and never need a remake.
+        reloop = False
+        pages_changed = initial_total_pages != actual_total_pages
         for page_data in context.page_maker:
             # Update pages
             _, _, _, page_state, remake_state = page_data
             page_counter_values = page_state[1]
             page_counter_values['pages'] = [actual_total_pages]
+            if remake_state['pages_wanted'] and pages_changed:
+                remake_state['content_changed'] = True
             if remake_state['content_changed']:
-                reloop_content = True
-            if remake_state['pages_wanted']:
-                reloop_pages = initial_total_pages != actual_total_pages
+                reloop = True
 
         # No need for another loop, stop here
-        if not reloop_content and not reloop_pages:
+        if not reloop:
             break
 
     # Calculate string-sets and bookmark-labels containing page based counters
@@ -162,7 +182,9 @@ def layout_document(html, root_box, context, max_loops=8):
         _, _, _, page_state, _ = context.page_maker[i + 1]
         page_counter_values = page_state[1]
 
-        for child in page.descendants():
+        # Only boxes stored by make_page are needed, there is no need to walk
+        # the whole page tree again.
+        for child in page.post_layout_boxes:
             # Only one bookmark per original box
             if child.bookmark_label:
                 if child.element_tag.endswith('::before'):
@@ -177,9 +199,10 @@ def layout_document(html, root_box, context, max_loops=8):
                     checklist.append(child.element)
 
             if child.missing_link:
-                for (box, css_token), item in (
-                        context.target_collector.counter_lookup_items.items()):
-                    if child.missing_link == box and css_token != 'content':
+                box = child.missing_link
+                for css_token, item in (
+                        context.target_collector.box_counter_lookup_items[box]):
+                    if css_token != 'content':
                         if (css_token == 'bookmark-label' and
                                 not child.bookmark_label):
                             # don't refill it!
@@ -196,13 +219,18 @@ def layout_document(html, root_box, context, max_loops=8):
                     string_name, text = string_set
                     context.string_set[string_name][i+1].append(text)
 
-    # Add margin boxes
+    # Add fixed boxes of other pages and margin boxes
+    fixed_boxes = [
+        (i, box) for i, page in enumerate(pages) for box in page.fixed_boxes]
+    fixed_layouts = {}
     for i, page in enumerate(pages):
         root_children = []
         root, footnote_area = page.children
-        root_children.extend(layout_fixed_boxes(context, pages[:i], page))
+        root_children.extend(layout_fixed_boxes(
+            context, (box for j, box in fixed_boxes if j < i), page, fixed_layouts))
         root_children.extend(root.children)
-        root_children.extend(layout_fixed_boxes(context, pages[i + 1:], page))
+        root_children.extend(layout_fixed_boxes(
+            context, (box for j, box in fixed_boxes if j > i), page, fixed_layouts))
         root.children = root_children
         context.current_page = i + 1  # page_number starts at 1
 
@@ -232,6 +260,7 @@ class LayoutContext:
         self.target_collector = target_collector
         self._excluded_shapes_root_boxes = []
         self._excluded_shapes = {}
+        self._exclusion_indexes = {}
         self.footnotes = []
         self.page_footnotes = {}
         self.current_page_footnotes = []
@@ -247,7 +276,24 @@ class LayoutContext:
 
         # Cache
         self.tables = {}
+        self.content_widths = {}
         self.dictionaries = {}
+        self.flex_item_measures = {}
+        self.repeated_table_groups = {}
+
+    def clear_content_widths(self):
+        """Clear cached min- and max-content widths.
+
+        Must be called when the content of boxes is updated, as boxes including
+        updated descendants may then have different content widths. Measures
+        of flex items and layouts of repeated table headers and footers,
+        depending on this content, are cleared too.
+
+        """
+        self.tables.clear()
+        self.content_widths.clear()
+        self.flex_item_measures.clear()
+        self.repeated_table_groups.clear()
 
     def overflows_page(self, bottom_space, position_y):
         return self.overflows(self.page_bottom - bottom_space, position_y)
@@ -265,6 +311,30 @@ class LayoutContext:
     @excluded_shapes.setter
     def excluded_shapes(self, excluded_shapes):
         self._excluded_shapes[self._excluded_shapes_root_boxes[-1]] = excluded_shapes
+        self.excluded_shapes_changed()
+
+    def excluded_shapes_changed(self):
+        """Drop the index of the current excluded shapes.
+
+        Must be called when shapes are added to or removed from the list of
+        current excluded shapes, or when they are moved.
+
+        """
+        self._exclusion_indexes.pop(self._excluded_shapes_root_boxes[-1], None)
+
+    def exclusion_index(self):
+        """Return the index of the current excluded shapes.
+
+        The index is built again only when shapes have been added, removed or
+        moved since the last call, see :meth:`excluded_shapes_changed`.
+
+        """
+        root_box = self._excluded_shapes_root_boxes[-1]
+        index = self._exclusion_indexes.get(root_box)
+        if index is None:
+            shapes = self._excluded_shapes[root_box]
+            index = self._exclusion_indexes[root_box] = ExclusionIndex(shapes)
+        return index
 
     def create_block_formatting_context(self, root_box=None, new_list=None):
         assert root_box not in self._excluded_shapes_root_boxes
@@ -276,11 +346,11 @@ class LayoutContext:
         # See https://www.w3.org/TR/CSS2/visudet.html#root-height
         if root_box and root_box.style['height'] == 'auto' and self.excluded_shapes:
             box_bottom = root_box.content_box_y() + root_box.height
-            max_shape_bottom = max([
-                shape.position_y + shape.margin_height()
-                for shape in self.excluded_shapes] + [box_bottom])
+            max_shape_bottom = max(self.exclusion_index().max_bottom, box_bottom)
             root_box.height += max_shape_bottom - box_bottom
-        self._excluded_shapes.pop(self._excluded_shapes_root_boxes.pop())
+        root_box = self._excluded_shapes_root_boxes.pop()
+        self._excluded_shapes.pop(root_box)
+        self._exclusion_indexes.pop(root_box, None)
 
     def create_flex_formatting_context(self, root_box):
         self.create_block_formatting_context(root_box, FakeList())
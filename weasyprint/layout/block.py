@@ -205,7 +205,12 @@ block_level_width.without_min_max = partial(block_level_width, with_min_max=Fals
 
 
 def relative_positioning(box, containing_block):
-    """Translate the ``box`` if it is relatively positioned."""
+    """Translate the ``box`` if it is relatively positioned.
+
+    Return whether the box or one of its children has been translated.
+
+    """
+    translated = False
     if box.style['position'] == 'relative':
         resolve_position_percentages(box, containing_block)
 
@@ -229,10 +234,12 @@ def relative_positioning(box, containing_block):
             translate_y = 0
 
         box.translate(translate_x, translate_y)
+        translated = bool(translate_x or translate_y)
 
     if isinstance(box, (boxes.InlineBox, boxes.LineBox)):
         for child in box.children:
-            relative_positioning(child, containing_block)
+            translated = relative_positioning(child, containing_block) or translated
+    return translated
 
 
 def _out_of_flow_layout(context, box, index, child, new_children,
@@ -426,6 +433,7 @@ def _linebox_layout(context, box, index, child, new_children, page_is_empty,
             # too high to be drawn in one page
             new_position_y -= box.margin_top
             line.translate(0, -box.margin_top)
+            context.excluded_shapes_changed()
             box.margin_top = 0
 
         if context.footnotes:
@@ -505,14 +513,19 @@ def _in_flow_layout(context, box, index, child, new_children, page_is_empty,
                 [*adjoining_margins, child_margin_top])
             collapsed_margin_difference = (
                 new_collapsed_margin - old_collapsed_margin)
-            for previous_new_child in new_children:
-                previous_new_child.translate(dy=collapsed_margin_difference)
+            if collapsed_margin_difference and new_children:
+                # Previous children may include floats.
+                for previous_new_child in new_children:
+                    previous_new_child.translate(dy=collapsed_margin_difference)
+                context.excluded_shapes_changed()
             direction = box.style['direction']
             clearance = get_clearance(context, child, direction, new_collapsed_margin)
             if clearance is not None:
-                for previous_new_child in new_children:
-                    previous_new_child.translate(
-                        dy=-collapsed_margin_difference)
+                if collapsed_margin_difference and new_children:
+                    for previous_new_child in new_children:
+                        previous_new_child.translate(
+                            dy=-collapsed_margin_difference)
+                    context.excluded_shapes_changed()
 
                 collapsed_margin = collapse_margin(adjoining_margins)
                 box.position_y += collapsed_margin - box.margin_top
@@ -880,9 +893,7 @@ def block_container_layout(context, box, bottom_space, skip_stack, page_is_empty
     # TODO: See float.float_layout
     if new_box.height == 'auto':
         if context.excluded_shapes and new_box.style['overflow'] != 'visible':
-            max_float_position_y = max(
-                float_box.position_y + float_box.margin_height()
-                for float_box in context.excluded_shapes)
+            max_float_position_y = context.exclusion_index().max_bottom
             position_y = max(max_float_position_y, position_y)
         if position_y == new_box.content_box_y() == inf:
             new_box.height = 0
@@ -897,7 +908,9 @@ def block_container_layout(context, box, bottom_space, skip_stack, page_is_empty
                 skip_stack=None)
 
     for child in new_box.children:
-        relative_positioning(child, (new_box.width, new_box.height))
+        if relative_positioning(child, (new_box.width, new_box.height)):
+            # Translated children may include floats.
+            context.excluded_shapes_changed()
 
     if box.establishes_formatting_context():
         context.finish_block_formatting_context(new_box)
@@ -1118,6 +1131,7 @@ def remove_placeholders(context, box_list, absolute_boxes, fixed_boxes):
             context.broken_out_of_flow.pop(box)
         if box in context.excluded_shapes:
             context.excluded_shapes.remove(box)
+            context.excluded_shapes_changed()
 
 
 def avoid_page_break(page_break, context):
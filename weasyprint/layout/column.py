@@ -92,12 +92,19 @@ def columns_layout(context, box, bottom_space, skip_stack, containing_block,
     # whether the whole content can fit. If it doesn’t fit, we keep the partial
     # rendering. If it fits, we try to balance the columns starting from the
     # ideal height (the total height divided by the number of columns). We then
-    # iterate until the last column is not the highest one. At the end of each
-    # loop, we add the minimal height needed to make one direct child at the
-    # top of one column go to the end of the previous column.
+    # search the minimal height between a lower bound, where the content
+    # doesn’t fit, and an upper bound, where the content fits.
     #
-    # We rely on a real rendering for each loop, and with a stupid algorithm
-    # like this it can last minutes…
+    # When the content doesn’t fit, the lower bound is increased by the
+    # minimal height needed to make one direct child at the top of one column
+    # go to the end of the previous column, as no other break is possible
+    # before. Until the content fits, the height is increased by steps growing
+    # exponentially from this lower bound. When the content fits, the upper
+    # bound is set to the height of the highest column, as the same breaks are
+    # found with this height, and the next heights are found by bisection.
+    #
+    # We rely on a real rendering for each loop, but the heights of the
+    # boxes at the top of the columns are only rendered once.
 
     adjoining_margins = []
     current_position_y = box.content_box_y()
@@ -153,18 +160,23 @@ def columns_layout(context, box, bottom_space, skip_stack, containing_block,
         # height step by step
         column_skip_stack = skip_stack
         lost_space = inf
+        min_height = max_balanced_height = growth = 0
+        fitting_height = None
+        next_box_heights = {}
         original_excluded_shapes = context.excluded_shapes[:]
         original_page_is_empty = page_is_empty
         page_is_empty = stop_rendering = balancing = False
         while True:
             # Remove extra excluded shapes introduced during the previous loop
-            while len(context.excluded_shapes) > len(original_excluded_shapes):
-                context.excluded_shapes.pop()
+            if len(context.excluded_shapes) > len(original_excluded_shapes):
+                del context.excluded_shapes[len(original_excluded_shapes):]
+                context.excluded_shapes_changed()
 
             # Render the columns
             column_skip_stack = skip_stack
             consumed_heights = []
             new_boxes = []
+            lost_space = inf
             for i in range(count):
                 # Render one column
                 new_box, resume_at, next_page, _, _, _ = block_box_layout(
@@ -195,15 +207,21 @@ def columns_layout(context, box, bottom_space, skip_stack, containing_block,
                     # Get the minimum size needed to render the next box
                     next_box_height = 0
                     if column_skip_stack:
-                        next_box = block_box_layout(
-                            context, column_box, inf, column_skip_stack,
-                            containing_block, True, [], [], [], first_letter_style,
-                            first_line_style, discard=False, max_lines=None)[0]
-                        for child in next_box.children:
-                            if child.is_in_normal_flow():
-                                next_box_height = child.margin_height()
-                                break
-                        remove_placeholders(context, [next_box], [], [])
+                        key = _skip_stack_key(column_skip_stack)
+                        if key in next_box_heights:
+                            next_box_height = next_box_heights[key]
+                        else:
+                            next_box = block_box_layout(
+                                context, column_box, inf, column_skip_stack,
+                                containing_block, True, [], [], [],
+                                first_letter_style, first_line_style, discard=False,
+                                max_lines=None)[0]
+                            for child in next_box.children:
+                                if child.is_in_normal_flow():
+                                    next_box_height = child.margin_height()
+                                    break
+                            remove_placeholders(context, [next_box], [], [])
+                            next_box_heights[key] = next_box_height
                 else:
                     consumed_height = empty_space = next_box_height = 0
 
@@ -239,18 +257,37 @@ def columns_layout(context, box, bottom_space, skip_stack, containing_block,
 
             if balancing:
                 if column_skip_stack is None:
-                    # We rendered the whole content, stop
-                    break
-
-                # Increase the column heights and render them again
-                add_height = 1 if lost_space == inf else lost_space
-                height += add_height
+                    # We rendered the whole content, the columns don’t need to
+                    # be higher than the highest one
+                    fitting_height = height
+                    max_balanced_height = min(height, max(consumed_heights))
+                else:
+                    # The content doesn’t fit, the columns have to be higher
+                    min_height = height + (1 if lost_space == inf else lost_space)
+                    if min_height > max_height:
+                        # We reached max height, stop rendering
+                        height = max_height
+                        stop_rendering = True
+                        break
 
-                if height > max_height:
-                    # We reached max height, stop rendering
-                    height = max_height
-                    stop_rendering = True
+                if fitting_height is None:
+                    # No height where the content fits has been found yet,
+                    # render higher and higher columns
+                    height = min(max_height, min_height + growth)
+                    growth = 2 * growth + (1 if lost_space == inf else lost_space)
+                elif fitting_height - min_height < 1:
+                    # The columns are balanced, keep the lowest height where
+                    # the whole content fits
+                    height = fitting_height
                     break
+                else:
+                    # Render the columns again between the bounds
+                    if min_height > max_balanced_height:
+                        max_balanced_height = fitting_height
+                    if max_balanced_height - min_height < 1:
+                        height = max_balanced_height
+                    else:
+                        height = (min_height + max_balanced_height) / 2
             else:
                 if last_footnotes_height not in footnote_area_heights:
                     # Footnotes have been rendered, try to re-render with the
@@ -268,7 +305,7 @@ def columns_layout(context, box, bottom_space, skip_stack, containing_block,
                     if (style['column_fill'] == 'balance' or
                             index < columns_and_blocks[-1][0]):
                         balancing = True
-                        height = sum(consumed_heights) / count
+                        height = min_height = sum(consumed_heights) / count
                     else:
                         break
                 else:
@@ -400,6 +437,13 @@ def _report_footnotes(context, footnotes_height):
         context.reported_footnotes[-reported_footnotes:] = extra
 
 
+def _skip_stack_key(skip_stack):
+    """Return a hashable key corresponding to ``skip_stack``."""
+    if skip_stack is None:
+        return None
+    return tuple((key, _skip_stack_key(value)) for key, value in skip_stack.items())
+
+
 def _create_column_box(box, containing_block, children, width, position_y):
     """Create a column box including given children."""
     column_box = box.anonymous_from(box, children=children)
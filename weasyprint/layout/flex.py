@@ -2,6 +2,7 @@
 
 import sys
 from math import inf, log10
+from operator import attrgetter
 
 from ..css.properties import Dimension
 from ..formatting_structure import boxes
@@ -10,11 +11,42 @@ from .absolute import AbsolutePlaceholder, absolute_layout
 from .preferred import max_content_width, min_content_width, min_max
 from .table import find_in_flow_baseline, table_wrapper_width
 
+_item_sizes = attrgetter(
+    'width', 'height', 'min_width', 'max_width', 'min_height', 'max_height',
+    'margin_top', 'margin_right', 'margin_bottom', 'margin_left',
+    'position_x', 'position_y')
+
 
 class FlexLine(list):
     """Flex container line."""
 
 
+def _measure_item(context, child, parent_box, skip_stack, values, measure):
+    """Return the measures of a hypothetical layout of the flex item ``child``.
+
+    ``measure`` lays out a copy of ``child`` and returns the values needed by
+    the flex algorithm. As flex containers lay out their items multiple times,
+    and nested flex containers multiply these layouts, measures are cached and
+    reused while ``child``, its style, its children, its used sizes, the size
+    of ``parent_box`` and the given ``values`` are the same. The cache is
+    cleared for each page and when content widths are cleared.
+
+    """
+    if skip_stack is not None:
+        return measure()
+    key = (
+        child, _item_sizes(child), parent_box.width, parent_box.height,
+        context.page_bottom, context.forced_break, *values)
+    children = getattr(child, 'children', None)
+    if (cached := context.flex_item_measures.get(key)) is not None:
+        style, cached_children, measures = cached
+        if style is child.style and cached_children is children:
+            return measures
+    measures = measure()
+    context.flex_item_measures[key] = (child.style, children, measures)
+    return measures
+
+
 def flex_layout(context, box, bottom_space, skip_stack, containing_block, page_is_empty,
                 absolute_boxes, fixed_boxes, discard):
     from . import block
@@ -184,18 +216,28 @@ def flex_layout(context, box, bottom_space, skip_stack, containing_block, page_i
         if child.style['min_height'] == 'auto':
             # TODO: avoid calling block_level_layout, write min_content_height instead.
             specified_size = child.height
-            new_child = child.copy()
-            new_child.style = child.style.copy()
-            new_child.style['height'] = 'auto'
-            new_child.style['min_height'] = Dimension(0, 'px')
-            new_child.style['max_height'] = Dimension(inf, 'px')
-            if new_child.style['width'] == 'auto':
-                new_child_width = max_content_width(context, new_child)
-                new_child.style['width'] = Dimension(new_child_width, 'px')
-            new_child = block.block_level_layout(
-                context, new_child, bottom_space, child_skip_stack, parent_box,
-                page_is_empty)[0]
-            content_size = new_child.height if new_child else 0
+
+            def measure_content_height():
+                new_child = child.copy()
+                new_child.style = child.style.copy()
+                new_child.style['height'] = 'auto'
+                new_child.style['min_height'] = Dimension(0, 'px')
+                new_child.style['max_height'] = Dimension(inf, 'px')
+                if new_child.style['width'] == 'auto':
+                    new_child_width = max_content_width(context, new_child)
+                    new_child.style['width'] = Dimension(new_child_width, 'px')
+                new_child = block.block_level_layout(
+                    context, new_child, bottom_space, child_skip_stack,
+                    parent_box, page_is_empty)[0]
+                if not new_child:
+                    return 0
+                block.remove_placeholders(
+                    context, new_child.children, absolute_boxes, fixed_boxes)
+                return new_child.height
+
+            content_size = _measure_item(
+                context, child, parent_box, child_skip_stack,
+                ('min_height', bottom_space, page_is_empty), measure_content_height)
             transferred_size = None
             if isinstance(child, boxes.ReplacedBox):
                 image = child.replacement
@@ -215,9 +257,6 @@ def flex_layout(context, box, bottom_space, skip_stack, containing_block, page_i
                 child.min_height = min(transferred_size, content_size)
             else:
                 child.min_height = content_size
-            if new_child:
-                block.remove_placeholders(
-                    context, new_child.children, absolute_boxes, fixed_boxes)
 
         if child.style['flex_basis'] == 'content':
             flex_basis = 'content'
@@ -270,20 +309,25 @@ def flex_layout(context, box, bottom_space, skip_stack, containing_block, page_i
                 new_child.style['min_height'] = Dimension(0, 'px')
                 new_child.style['max_height'] = Dimension(inf, 'px')
 
-                new_child.width = inf
-                new_child, _, _, adjoining_margins, _, _ = block.block_level_layout(
-                    context, new_child, bottom_space, child_skip_stack, parent_box,
-                    page_is_empty, absolute_boxes, fixed_boxes)
-                if new_child:
-                    # As flex items margins never collapse (with other flex items or
-                    # with the flex container), we can add the adjoining margins to the
-                    # child height.
-                    new_child.height += block.collapse_margin(adjoining_margins)
-                    child.flex_base_size = new_child.height
-                    child.main_outer_extra = (
-                        new_child.margin_height() - new_child.height)
-                else:
-                    child.flex_base_size = child.main_outer_extra = 0
+                def measure_base_size():
+                    new_child.width = inf
+                    layout_child, _, _, adjoining_margins, _, _ = (
+                        block.block_level_layout(
+                            context, new_child, bottom_space, child_skip_stack,
+                            parent_box, page_is_empty, absolute_boxes, fixed_boxes))
+                    if not layout_child:
+                        return 0, 0
+                    # As flex items margins never collapse (with other flex items
+                    # or with the flex container), we can add the adjoining
+                    # margins to the child height.
+                    layout_child.height += block.collapse_margin(adjoining_margins)
+                    return (
+                        layout_child.height,
+                        layout_child.margin_height() - layout_child.height)
+
+                child.flex_base_size, child.main_outer_extra = _measure_item(
+                    context, child, parent_box, child_skip_stack,
+                    ('flex_basis', bottom_space, page_is_empty), measure_base_size)
 
         if main == 'width':
             position_x += child.flex_base_size + child.main_outer_extra
@@ -494,30 +538,40 @@ def flex_layout(context, box, bottom_space, skip_stack, containing_block, page_i
                 child.margin_top = 0
             if child.margin_bottom == 'auto':
                 child.margin_bottom = 0
-            # TODO: Find another way than calling block_level_layout_switch.
-            new_child = child.copy()
-            new_child, _, _, adjoining_margins, _, _ = block.block_level_layout_switch(
-                context, new_child, -inf, child_skip_stack, parent_box, page_is_empty,
-                absolute_boxes, fixed_boxes, adjoining_margins=[],
-                first_letter_style=None, first_line_style=None, discard=discard,
-                max_lines=None)
-            child._baseline = find_in_flow_baseline(new_child) or 0
+            def measure_cross_size():
+                # TODO: Find another way than calling block_level_layout_switch.
+                new_child = child.copy()
+                new_child, _, _, adjoining_margins, _, _ = (
+                    block.block_level_layout_switch(
+                        context, new_child, -inf, child_skip_stack, parent_box,
+                        page_is_empty, absolute_boxes, fixed_boxes,
+                        adjoining_margins=[], first_letter_style=None,
+                        first_line_style=None, discard=discard, max_lines=None))
+                baseline = find_in_flow_baseline(new_child) or 0
+                if cross == 'height':
+                    # As flex items margins never collapse (with other flex items
+                    # or with the flex container), we can add the adjoining
+                    # margins to the child height.
+                    cross_size = (
+                        new_child.height + block.collapse_margin(adjoining_margins))
+                else:
+                    cross_size = new_child.width
+                if new_child:
+                    block.remove_placeholders(
+                        context, new_child.children, absolute_boxes, fixed_boxes)
+                return baseline, cross_size
+
+            child._baseline, cross_size = _measure_item(
+                context, child, parent_box, child_skip_stack,
+                ('cross_size', page_is_empty, discard), measure_cross_size)
             if cross == 'height':
-                child.height = new_child.height
-                # As flex items margins never collapse (with other flex items or
-                # with the flex container), we can add the adjoining margins to the
-                # child height.
-                child.height += block.collapse_margin(adjoining_margins)
+                child.height = cross_size
+            elif child.width == 'auto':
+                min_width = min_content_width(context, child, outer=False)
+                max_width = max_content_width(context, child, outer=False)
+                child.width = min(max(min_width, cross_size), max_width)
             else:
-                if child.width == 'auto':
-                    min_width = min_content_width(context, child, outer=False)
-                    max_width = max_content_width(context, child, outer=False)
-                    child.width = min(max(min_width, new_child.width), max_width)
-                else:
-                    child.width = new_child.width
-            if new_child:
-                block.remove_placeholders(
-                    context, new_child.children, absolute_boxes, fixed_boxes)
+                child.width = cross_size
 
             new_flex_line.append((index, child))
 
@@ -1,5 +1,9 @@
 """Layout for floating boxes."""
 
+from bisect import bisect_right
+from itertools import accumulate
+from math import inf
+from operator import itemgetter
 from sys import maxsize
 
 from ..formatting_structure import boxes
@@ -10,6 +14,50 @@ from .replaced import inline_replaced_box_width_height
 from .table import table_wrapper_width
 
 
+class ExclusionIndex:
+    """Index of the exclusion shapes of a block formatting context.
+
+    Shapes are sorted by the lowest position of their vertical extent, with
+    the maximum highest position of the previous shapes, so that shapes
+    overlapping a vertical band are found without checking all the shapes.
+
+    The index is only valid while shapes are not added, removed or moved. It
+    is dropped by the layout context when shapes are added or removed, and by
+    the layout code translating boxes that may include current shapes, see
+    :meth:`LayoutContext.excluded_shapes_changed`.
+
+    """
+    def __init__(self, shapes):
+        extents = []
+        for shape in shapes:
+            top = shape.position_y
+            bottom = top + shape.margin_height()
+            # Extents may be reversed because of negative margins.
+            extents.append((min(top, bottom), max(top, bottom), top, bottom, shape))
+        extents.sort(key=itemgetter(0, 1))
+        self.lows = [extent[0] for extent in extents]
+        self.max_highs = list(accumulate((extent[1] for extent in extents), max))
+        self.extents = [extent[2:] for extent in extents]
+        self.max_bottom = max(
+            (bottom for _, bottom, _ in self.extents), default=None)
+
+    def overlapping(self, top, bottom=inf):
+        """Yield shapes that may overlap the band between ``top`` and ``bottom``.
+
+        Yield ``(shape_top, shape_bottom, shape)`` tuples, including at least
+        all the shapes whose vertical extent intersects the band.
+
+        """
+        top, bottom = min(top, bottom), max(top, bottom)
+        extents, max_highs = self.extents, self.max_highs
+        index = bisect_right(self.lows, bottom)
+        while index and max_highs[index - 1] >= top:
+            index -= 1
+            shape_top, shape_bottom, _ = extent = extents[index]
+            if max(shape_top, shape_bottom) >= top:
+                yield extent
+
+
 @handle_min_max_width
 def float_width(box, context, containing_block):
     # Check that box.width is auto even if the caller does it too, because
@@ -81,6 +129,7 @@ def float_layout(context, box, containing_block, absolute_boxes, fixed_boxes,
     box = find_float_position(context, box, containing_block)
 
     context.excluded_shapes.append(box)
+    context.excluded_shapes_changed()
     return box, resume_at
 
 
@@ -91,11 +140,14 @@ def find_float_position(context, box, containing_block):
     # Point 4 is already handled as box.position_y is set according to the
     # containing box top position, with collapsing margins handled
 
-    # Points 5 and 6, box.position_y is set to the highest position_y possible
+    # Points 5 and 6, box.position_y is set to the highest position_y possible.
+    # Only the box is moved here, its descendants are translated once when the
+    # final position is known.
+    original_x, original_y = box.position_x, box.position_y
     if context.excluded_shapes:
         highest_y = context.excluded_shapes[-1].position_y
         if box.position_y < highest_y:
-            box.translate(0, highest_y - box.position_y)
+            box.position_y = highest_y
 
     # Points 1 and 2
     position_x, position_y, available_width = avoid_collisions(
@@ -111,7 +163,8 @@ def find_float_position(context, box, containing_block):
     if float_right:
         position_x += available_width - box.margin_width()
 
-    box.translate(position_x - box.position_x, position_y - box.position_y)
+    box.position_x, box.position_y = original_x, original_y
+    box.translate(position_x - original_x, position_y - original_y)
 
     return box
 
@@ -139,16 +192,16 @@ def get_clearance(context, box, direction, collapsed_margin=0):
     # Hypothetical position is the position of the top border edge
     clearance = None
     hypothetical_position = box.position_y + collapsed_margin
-    for excluded_shape in context.excluded_shapes:
+    shapes = context.exclusion_index().overlapping(hypothetical_position)
+    for _, shape_bottom, excluded_shape in shapes:
         if clear(box.style['clear'], excluded_shape.style['float']):
-            y, h = excluded_shape.position_y, excluded_shape.margin_height()
-            if hypothetical_position < y + h:
-                clearance = max((clearance or 0), y + h - hypothetical_position)
+            if hypothetical_position < shape_bottom:
+                clearance = max(
+                    (clearance or 0), shape_bottom - hypothetical_position)
     return clearance
 
 
 def avoid_collisions(context, box, containing_block, outer=True):
-    excluded_shapes = context.excluded_shapes
     position_y = box.position_y if outer else box.border_box_y()
 
     box_width = box.margin_width() if outer else box.border_width()
@@ -166,20 +219,18 @@ def avoid_collisions(context, box, containing_block, outer=True):
         left_keywords.append('inline-end')
         right_keywords.append('inline-start')
 
+    exclusion_index = context.exclusion_index()
     while True:
         colliding_shapes = []
-        for shape in excluded_shapes:
-            # Assign locals to avoid slow attribute lookups.
-            shape_position_y = shape.position_y
-            shape_margin_height = shape.margin_height()
-            if ((shape_position_y < position_y <
-                 shape_position_y + shape_margin_height) or
-                (shape_position_y < position_y + box_height <
-                 shape_position_y + shape_margin_height) or
-                (shape_position_y >= position_y and
-                 shape_position_y + shape_margin_height <=
-                 position_y + box_height)):
+        colliding_bottoms = []
+        box_bottom = position_y + box_height
+        shapes = exclusion_index.overlapping(position_y, box_bottom)
+        for shape_top, shape_bottom, shape in shapes:
+            if ((shape_top < position_y < shape_bottom) or
+                    (shape_top < box_bottom < shape_bottom) or
+                    (shape_top >= position_y and shape_bottom <= box_bottom)):
                 colliding_shapes.append(shape)
+                colliding_bottoms.append(shape_bottom)
         left_bounds = [
             shape.position_x + shape.margin_width()
             for shape in colliding_shapes
@@ -207,9 +258,7 @@ def avoid_collisions(context, box, containing_block, outer=True):
             # Points 3, 7 and 8
             if box_width > max_right_bound - max_left_bound:
                 # The box does not fit here
-                new_position_y = min(
-                    shape.position_y + shape.margin_height()
-                    for shape in colliding_shapes)
+                new_position_y = min(colliding_bottoms)
                 if new_position_y > position_y:
                     # We can find a solution with a higher position_y
                     position_y = new_position_y
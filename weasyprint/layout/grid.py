@@ -1,7 +1,7 @@
 """Layout for grid containers and grid-items."""
 
 from collections import defaultdict
-from itertools import count, cycle
+from itertools import count, cycle, product
 from math import inf
 
 from ..css.properties import Dimension
@@ -26,13 +26,29 @@ def _intersect(position_1, size_1, position_2, size_2):
         position_2 < position_1 + size_1)
 
 
-def _intersect_with_children(x, y, width, height, positions):
-    for full_x, full_y, full_width, full_height in positions:
-        x_intersect = _intersect(x, width, full_x, full_width)
-        y_intersect = _intersect(y, height, full_y, full_height)
-        if x_intersect and y_intersect:
-            return True
-    return False
+def _occupy(occupied_cells, x, y, width, height):
+    """Add the cells of the given area to the set of occupied cells."""
+    occupied_cells.update(product(range(x, x + width), range(y, y + height)))
+
+
+def _intersect_with_children(x, y, width, height, occupied_cells):
+    """Return whether the given area includes cells occupied by children."""
+    return not occupied_cells.isdisjoint(
+        product(range(x, x + width), range(y, y + height)))
+
+
+def _first_free_line(occupied_cells, first_i, second_1, second_2, first_flow):
+    """Return the first row (resp. column) from ``first_i`` with a free cell."""
+    if second_1 >= second_2:
+        return first_i
+    while True:
+        if first_flow == 'row':
+            cells = ((second_i, first_i) for second_i in range(second_1, second_2))
+        else:
+            cells = ((first_i, second_i) for second_i in range(second_1, second_2))
+        if not occupied_cells.issuperset(cells):
+            return first_i
+        first_i += 1
 
 
 def _get_line(line, lines, side):
@@ -228,9 +244,41 @@ def _get_template_tracks(tracks):
     return tracks_list
 
 
+def _get_contribution(context, item, parent, size_contribution, direction,
+                      contributions):
+    """Get the size contribution of a grid item in a given direction.
+
+    Contributions are stored in ``contributions``, so that they are only
+    computed once for each item during a track sizing pass.
+
+    """
+    # TODO: Differenciate minimum and min-content values.
+    max_content = direction == 'x' and size_contribution == 'max-content'
+    key = (item, max_content)
+    if key in contributions:
+        return contributions[key]
+    if direction == 'x':
+        if max_content:
+            contribution = max_content_width(context, item)
+        else:
+            contribution = min_content_width(context, item)
+    else:
+        # TODO: Find a better way to get height.
+        from .block import block_level_layout
+        item = item.deepcopy()
+        item.position_x = 0
+        item.position_y = 0
+        item, _, _, _, _, _ = block_level_layout(
+            context, item, bottom_space=-inf, skip_stack=None,
+            containing_block=parent)
+        contribution = item.margin_height()
+    contributions[key] = contribution
+    return contribution
+
+
 def _distribute_extra_space(affected_sizes, affected_tracks_types, size_contribution,
                             tracks_children, sizing_functions, tracks_sizes, span,
-                            direction, context):
+                            direction, context, contributions):
     assert affected_sizes in ('min', 'max')
     assert affected_tracks_types in (
         'intrinsic', 'content-based', 'max-content')
@@ -271,22 +319,8 @@ def _distribute_extra_space(affected_sizes, affected_tracks_types, size_contribu
             continue
         for item, parent in children:
             # 2.1 Find the space distribution.
-            # TODO: Differenciate minimum and min-content values.
-            # TODO: Find a better way to get height.
-            if direction == 'x':
-                if size_contribution in ('minimum', 'min-content'):
-                    space = min_content_width(context, item)
-                else:
-                    space = max_content_width(context, item)
-            else:
-                from .block import block_level_layout
-                item = item.deepcopy()
-                item.position_x = 0
-                item.position_y = 0
-                item, _, _, _, _, _ = block_level_layout(
-                    context, item, bottom_space=-inf, skip_stack=None,
-                    containing_block=parent)
-                space = item.margin_height()
+            space = _get_contribution(
+                context, item, parent, size_contribution, direction, contributions)
             for sizes in tracks_sizes[i:i+span]:
                 space -= sizes[affected_size_index]
             space = max(0, space)
@@ -437,6 +471,7 @@ def _resolve_tracks_sizes(sizing_functions, box_size, children_positions,
         if None not in sizes:
             sizes[1] = max(sizes)
     # 1.2.3 Increase sizes to accommodate items spanning content-sized tracks.
+    contributions = {}
     spans = sorted({
         width if direction == 'x' else height
         for (_, _, width, height) in children_positions.values()
@@ -461,26 +496,31 @@ def _resolve_tracks_sizes(sizing_functions, box_size, children_positions,
         # TODO: Respect min-/max-content constraint.
         _distribute_extra_space(
             'min', 'intrinsic', 'minimum', tracks_children,
-            sizing_functions, tracks_sizes, span, direction, context)
+            sizing_functions, tracks_sizes, span, direction, context,
+            contributions)
         # 1.2.3.2 For content-based minimums.
         _distribute_extra_space(
             'min', 'content-based', 'min-content', tracks_children,
-            sizing_functions, tracks_sizes, span, direction, context)
+            sizing_functions, tracks_sizes, span, direction, context,
+            contributions)
         # 1.2.3.3 For max-content minimums.
         # TODO: Respect max-content constraint.
         _distribute_extra_space(
             'min', 'max-content', 'max-content', tracks_children,
-            sizing_functions, tracks_sizes, span, direction, context)
+            sizing_functions, tracks_sizes, span, direction, context,
+            contributions)
         # 1.2.3.4 Increase growth limit.
         # TODO: Increase growth limit.
         # 1.2.3.5 For intrinsic maximums.
         _distribute_extra_space(
             'max', 'intrinsic', 'min-content', tracks_children,
-            sizing_functions, tracks_sizes, span, direction, context)
+            sizing_functions, tracks_sizes, span, direction, context,
+            contributions)
         # 1.2.3.6 For max-content maximums.
         _distribute_extra_space(
             'max', 'max-content', 'max-content', tracks_children,
-            sizing_functions, tracks_sizes, span, direction, context)
+            sizing_functions, tracks_sizes, span, direction, context,
+            contributions)
     # 1.2.4 Increase sizes to accommodate items spanning flexible tracks.
     # TODO: Support spans for flexible tracks.
     # 1.2.5 Fix infinite growth limits.
@@ -666,6 +706,7 @@ def grid_layout(context, box, bottom_space, skip_stack, containing_block,
     # 1.1 Position anything that’s not auto-positioned.
     children = sorted(box.children, key=lambda item: item.style['order'])
     children_positions = {}
+    occupied_cells = set()
     for child in children:
         column_start = child.style['grid_column_start']
         column_end = child.style['grid_column_end']
@@ -680,6 +721,7 @@ def grid_layout(context, box, bottom_space, skip_stack, containing_block,
             x, width = column_placement
             y, height = row_placement
             children_positions[child] = (x, y, width, height)
+            _occupy(occupied_cells, x, y, width, height)
 
     # 1.2 Process the items locked to a given row (resp. column).
     for child in children:
@@ -702,6 +744,7 @@ def grid_layout(context, box, bottom_space, skip_stack, containing_block,
             x, width = first_placement
             y, height = second_placement
         children_positions[child] = (x, y, width, height)
+        _occupy(occupied_cells, x, y, width, height)
 
     # 1.3 Determine the columns (resp. rows) in the implicit grid.
     # 1.3.1 Start with the columns (resp. rows) from the explicit grid.
@@ -756,7 +799,13 @@ def grid_layout(context, box, bottom_space, skip_stack, containing_block,
         implicit_first_2 = max(i + size, implicit_first_2)
     cursor_first, cursor_second = implicit_first_1, implicit_second_1
     if 'dense' in flow:
+        # Rows (resp. columns) before this one are full, as items are never
+        # removed they can be skipped when the cursor is set to the start.
+        first_free_line = implicit_first_1
         for child in remaining_grid_items:
+            first_free_line = _first_free_line(
+                occupied_cells, first_free_line, implicit_second_1,
+                implicit_second_2, first_flow)
             first_start = child.style[f'grid_{first_flow}_start']
             first_end = child.style[f'grid_{first_flow}_end']
             second_start = child.style[f'grid_{second_flow}_start']
@@ -765,7 +814,7 @@ def grid_layout(context, box, bottom_space, skip_stack, containing_block,
                 second_start, second_end, second_tracks[::2])
             if second_placement:
                 # 1. Set the row (resp. column) position of the cursor.
-                cursor_first = implicit_first_1
+                cursor_first = first_free_line
                 second_i, second_size = second_placement
                 cursor_second = second_i
                 # 2. Increment the cursor’s row (resp. column) position.
@@ -789,7 +838,7 @@ def grid_layout(context, box, bottom_space, skip_stack, containing_block,
                             x, y = first_i, second_i
                             width, height = first_size, second_size
                         intersect = _intersect_with_children(
-                            x, y, width, height, children_positions.values())
+                            x, y, width, height, occupied_cells)
                         if intersect:
                             # Child intersects with a positioned child on
                             # current row.
@@ -809,9 +858,10 @@ def grid_layout(context, box, bottom_space, skip_stack, containing_block,
                     x, y = first_i, second_i
                     width, height = first_size, second_size
                 children_positions[child] = (x, y, width, height)
+                _occupy(occupied_cells, x, y, width, height)
             else:
                 # 1. Set the cursor’s row and column positions.
-                cursor_first, cursor_second = implicit_first_1, implicit_second_1
+                cursor_first, cursor_second = first_free_line, implicit_second_1
                 while True:
                     # 2. Increment the column (resp. row) position of the cursor.
                     first_i = cursor_first
@@ -841,7 +891,7 @@ def grid_layout(context, box, bottom_space, skip_stack, containing_block,
                             x, y = first_i, second_i
                             width, height = first_size, second_size
                         intersect = _intersect_with_children(
-                            x, y, width, height, children_positions.values())
+                            x, y, width, height, occupied_cells)
                         overflow = second_i + second_size > implicit_second_2
                         if intersect or overflow:
                             # Child intersects with a positioned child or overflows.
@@ -850,6 +900,7 @@ def grid_layout(context, box, bottom_space, skip_stack, containing_block,
                             # Free place found.
                             # 3. Set the item’s row-/column-start lines.
                             children_positions[child] = (x, y, width, height)
+                            _occupy(occupied_cells, x, y, width, height)
                             first_diff = (
                                 cursor_first + first_size - 1 - implicit_first_2)
                             if first_diff > 0:
@@ -901,7 +952,7 @@ def grid_layout(context, box, bottom_space, skip_stack, containing_block,
                             x, y = first_i, second_i
                             width, height = first_size, second_size
                         intersect = _intersect_with_children(
-                            x, y, width, height, children_positions.values())
+                            x, y, width, height, occupied_cells)
                         if intersect:
                             # Child intersects with a positioned child on
                             # current row.
@@ -915,6 +966,7 @@ def grid_layout(context, box, bottom_space, skip_stack, containing_block,
                     implicit_first_2 += first_diff
                 # 3. Set the item’s row-start line.
                 children_positions[child] = (x, y, width, height)
+                _occupy(occupied_cells, x, y, width, height)
             else:
                 while True:
                     # 1. Increment the column position of the cursor.
@@ -944,7 +996,7 @@ def grid_layout(context, box, bottom_space, skip_stack, containing_block,
                             x, y = first_i, second_i
                             width, height = first_size, second_size
                         intersect = _intersect_with_children(
-                            x, y, width, height, children_positions.values())
+                            x, y, width, height, occupied_cells)
                         overflow = second_i + second_size > implicit_second_2
                         if intersect or overflow:
                             # Child intersects with a positioned child or overflows.
@@ -953,6 +1005,7 @@ def grid_layout(context, box, bottom_space, skip_stack, containing_block,
                             # Free place found.
                             # 2. Set the item’s row-/column-start lines.
                             children_positions[child] = (x, y, width, height)
+                            _occupy(occupied_cells, x, y, width, height)
                             break
                     else:
                         # No room found.
@@ -101,6 +101,7 @@ def get_next_linebox(context, linebox, position_y, bottom_space, skip_stack,
         line_fixed = []
         waiting_floats = []
         line_children = []
+        shapes_count = len(context.excluded_shapes)
 
         (line, resume_at, preserved_line_break, first_letter,
          last_letter, float_width) = split_inline_box(
@@ -135,6 +136,9 @@ def get_next_linebox(context, linebox, position_y, bottom_space, skip_stack,
         line.margin_bottom = 0
 
         line.translate(offset_x, offset_y)
+        if len(context.excluded_shapes) != shapes_count:
+            # Floats have been placed in the line and translated with it.
+            context.excluded_shapes_changed()
         # Avoid floating point errors, as position_y - top + top != position_y
         # Removing this line breaks the position == linebox.position test below
         # See issue #583.
@@ -634,6 +638,7 @@ def _out_of_flow_layout(context, box, containing_block, index, child,
                     (float_right and box.style['direction'] == 'rtl'))
                 if float_align:
                     old_child.translate(dx=dx)
+                    context.excluded_shapes_changed()
 
     elif child.is_running():
         running_name = child.style['position'][1]
@@ -737,6 +742,7 @@ def split_inline_box(context, box, position_x, max_x, bottom_space, skip_stack,
     is_start = skip_stack is None
     initial_position_x = position_x
     initial_skip_stack = skip_stack
+    shapes_count = len(context.excluded_shapes)
     assert isinstance(box, (boxes.LineBox, boxes.InlineBox))
     left_spacing = (
         box.padding_left + box.margin_left + box.border_left_width)
@@ -893,6 +899,9 @@ def split_inline_box(context, box, position_x, max_x, bottom_space, skip_stack,
         if left_decoration:
             for child in new_box.children:
                 child.translate(dx=left_spacing)
+            if len(context.excluded_shapes) != shapes_count:
+                # Floats have been placed in the box and translated.
+                context.excluded_shapes_changed()
         new_box.translate(dx=float_widths['left'], ignore_floats=True)
 
     # Reset line box width according to its new children.
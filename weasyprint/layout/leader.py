@@ -73,3 +73,7 @@ def handle_leader(context, line, containing_block):
         box = box.children[index[0]]
         box.width += extra_width
         index = index[1]
+
+    if leader_box is not None:
+        # Following boxes may include floats.
+        context.excluded_shapes_changed()
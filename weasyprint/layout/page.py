@@ -387,7 +387,7 @@ def make_margin_boxes(context, page, state):
         # TODO: get actual counter values at the time of the last page break
         if box.is_generated:
             # @margins mustn't manipulate page-context counters
-            margin_state = copy.deepcopy(state)
+            margin_state = copy_page_state(state)
             quote_depth, counter_values, counter_scopes, _page_groups = margin_state
             # TODO: check this, probably useless
             counter_scopes.append(set())
@@ -613,6 +613,8 @@ def make_page(context, root_box, page_type, resume_at, page_number,
     context.create_block_formatting_context()
     context.current_page = page_number
     context.current_page_footnotes = []
+    context.content_widths.clear()
+    context.flex_item_measures.clear()
     context.current_footnote_area = footnote_area
 
     reported_footnotes = context.reported_footnotes
@@ -660,6 +662,7 @@ def make_page(context, root_box, page_type, resume_at, page_number,
     # Set excluded shapes from broken out-of-flow for in-flow content.
     for context_box, shapes in excluded_shapes.items():
         context._excluded_shapes[context_box] = shapes
+        context._exclusion_indexes.pop(context_box, None)
 
     # Display in-flow content.
     initial_root_box = root_box
@@ -726,15 +729,24 @@ def make_page(context, root_box, page_type, resume_at, page_number,
         cached_anchors.extend(x_remake_state.get('anchors', []))
         cached_lookups.extend(x_remake_state.get('content_lookups', []))
 
+    # Boxes needed once pagination is done, to fill bookmark labels and
+    # string sets depending on page-based counters.
+    page.post_layout_boxes = []
+
     for child in page.descendants(placeholders=True):
+        if child.bookmark_label or child.missing_link or child.string_set:
+            page.post_layout_boxes.append(child)
+
         # Cache target's page counters
         anchor = child.style['anchor']
         if anchor and anchor not in cached_anchors:
             remake_state['anchors'].append(anchor)
             cached_anchors.append(anchor)
             # Re-make of affected targeting boxes is inclusive
-            target_collector.cache_target_page_counters(
+            content_changed = target_collector.cache_target_page_counters(
                 anchor, page_counter_values, page_number - 1, page_maker)
+            if content_changed:
+                context.clear_content_widths()
 
         # string-set and bookmark-labels don't create boxes, only `content`
         # requires another call to make_page. There is maximum one 'content'
@@ -763,8 +775,8 @@ def make_page(context, root_box, page_type, resume_at, page_number,
             if counter_lookup.pending:
                 if (page_counter_values !=
                         counter_lookup.cached_page_counter_values):
-                    counter_lookup.cached_page_counter_values = copy.deepcopy(
-                        page_counter_values)
+                    counter_lookup.cached_page_counter_values = (
+                        page_counter_values.copy())
                 counter_lookup.pending = False
                 call_parse_again = True
 
@@ -775,17 +787,16 @@ def make_page(context, root_box, page_type, resume_at, page_number,
             if missing_counters:
                 if 'pages' in missing_counters:
                     remake_state['pages_wanted'] = True
-                if refresh_missing_counters and page_counter_values != \
-                        counter_lookup.cached_page_counter_values:
+                # Only the values of the missing counters are compared, other
+                # page counters don't change the box's content.
+                cached_values = counter_lookup.cached_page_counter_values
+                if refresh_missing_counters and any(
+                        page_counter_values.get(counter_name) !=
+                        cached_values.get(counter_name)
+                        for counter_name in missing_counters):
                     counter_lookup.cached_page_counter_values = \
-                        copy.deepcopy(page_counter_values)
-                    for counter_name in missing_counters:
-                        counter_value = page_counter_values.get(
-                            counter_name, None)
-                        if counter_value is not None:
-                            call_parse_again = True
-                            # no need to loop them all
-                            break
+                        page_counter_values.copy()
+                    call_parse_again = True
 
             # Step 3: targeted counters
             target_missing = counter_lookup.missing_target_counters
@@ -804,6 +815,7 @@ def make_page(context, root_box, page_type, resume_at, page_number,
             if call_parse_again:
                 remake_state['content_changed'] = True
                 counter_lookup.parse_again(page_counter_values)
+                context.clear_content_widths()
 
     if page_type.blank:
         resume_at = previous_resume_at
@@ -904,6 +916,23 @@ def _update_page_groups(page_groups, resume_at, next_page, root_box, blank):
             return next_page['page']
 
 
+def copy_page_state(page_state):
+    """Return a copy of ``page_state`` that can be modified independently.
+
+    This is a shallow copy replacing :func:`copy.deepcopy`, its cost still
+    depends on the size of the state. Only the mutable containers of the state
+    are copied. Lists of counter values are never modified in place, and the
+    skip stacks stored in page groups are never modified once stored, they are
+    shared with the original state.
+
+    """
+    quote_depth, counter_values, counter_scopes, page_groups = page_state
+    return (
+        quote_depth.copy(), counter_values.copy(),
+        [scope.copy() for scope in counter_scopes],
+        [page_group.copy() for page_group in page_groups])
+
+
 def remake_page(index, context, root_box, html):
     """Return one laid out page without margin boxes.
 
@@ -921,7 +950,7 @@ def remake_page(index, context, root_box, html):
 
     # PageType for current page, values for page_maker[index + 1].
     # Don't modify actual page_maker[index] values!
-    page_state = copy.deepcopy(page_state)
+    page_state = copy_page_state(page_state)
     if next_page['break'] in ('left', 'right'):
         next_page_side = next_page['break']
     elif next_page['break'] in ('recto', 'verso'):
@@ -956,7 +985,8 @@ def remake_page(index, context, root_box, html):
         # New page
         page_maker_next_changed = True
     else:
-        # Check whether something changed
+        # Check whether something changed. States are compared by value, but
+        # unchanged lists of counter values are shared and compared by identity.
         next_resume_at, next_next_page, next_right_page, next_page_state, _ = (
             page_maker[index + 1])
         page_maker_next_changed = (
@@ -996,9 +1026,7 @@ def make_all_pages(context, root_box, html, pages):
     reported_footnotes = None
     while True:
         remake_state = context.page_maker[i][-1]
-        if (len(pages) == 0 or
-                remake_state['content_changed'] or
-                remake_state['pages_wanted']):
+        if len(pages) == 0 or remake_state['content_changed']:
             PROGRESS_LOGGER.info('Step 5 - Creating layout - Page %d', i + 1)
             # Reset remake_state
             remake_state['content_changed'] = False
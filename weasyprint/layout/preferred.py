@@ -9,7 +9,7 @@ Baron's unofficial draft (https://dbaron.org/css/intrinsic/).
 """
 
 import sys
-from functools import cache
+from functools import cache, wraps
 from math import inf
 
 from ..css import resolve_math
@@ -36,6 +36,30 @@ def shrink_to_fit(context, box, available_content_width):
         max_content_width(context, box, outer=False))
 
 
+def _cached_content_width(function):
+    """Cache the content widths returned by ``function`` in ``context``.
+
+    Cached values are only used if the box’s style and children have not been
+    replaced since they were stored. The whole cache is cleared for each page,
+    and when boxes are updated by page-based counters, see
+    ``LayoutContext.clear_content_widths``.
+
+    """
+    @wraps(function)
+    def cached_function(context, box, outer=True):
+        key = (function, box, outer)
+        children = getattr(box, 'children', None)
+        if (cached := context.content_widths.get(key)) is not None:
+            style, cached_children, width = cached
+            if style is box.style and cached_children is children:
+                return width
+        width = function(context, box, outer)
+        context.content_widths[key] = (box.style, children, width)
+        return width
+    return cached_function
+
+
+@_cached_content_width
 def min_content_width(context, box, outer=True):
     """Return the min-content width for ``box``.
 
@@ -63,6 +87,7 @@ def min_content_width(context, box, outer=True):
         raise TypeError(f'min-content width for {type(box).__name__} not handled yet')
 
 
+@_cached_content_width
 def max_content_width(context, box, outer=True):
     """Return the max-content width for ``box``.
 
@@ -292,8 +317,8 @@ def table_cell_min_content_width(context, box, outer):
 
 def table_cell_min_max_content_width(context, box, outer=True):
     """Return the min- and max-content width for a ``TableCellBox``."""
-    # This is much faster than calling min and max separately.
-    min_width = table_cell_min_content_width(context, box, outer)
+    # The min-content width is cached, and used to get the max-content width.
+    min_width = min_content_width(context, box, outer)
     max_width = max(min_width, block_max_content_width(context, box, outer))
     return min_width, max_width
 
@@ -531,7 +556,8 @@ def table_and_columns_preferred_widths(context, box, outer=True):
             if not cell:
                 continue
             if cell.colspan == 1:
-                min_width, max_width = table_cell_min_max_content_width(context, cell)
+                min_width = min_content_width(context, cell)
+                max_width = max_content_width(context, cell)
                 min_content_widths[i] = max(min_content_widths[i], min_width)
                 max_content_widths[i] = max(max_content_widths[i], max_width)
                 intrinsic_percentages[i] = max(
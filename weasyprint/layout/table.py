@@ -86,15 +86,19 @@ def table_layout(context, table, bottom_space, skip_stack, containing_block,
         group.position_y = position_y
         group.width = rows_width
         new_group_children = []
-        # For each row, cells for which this is the last row (with rowspan).
-        ending_cells_by_row = [[] for row in group.children]
+        # Cells for which this is the last row (with rowspan), by row index.
+        # Only rows laid out on this page are stored, and rows are accessed
+        # by index, so that pages of large groups are laid out in a time and
+        # a memory that don’t depend on the number of rows before them.
+        ending_cells_by_row = {}
 
         is_group_start = skip_stack is None
         if is_group_start:
             skip = 0
         else:
             (skip, skip_stack), = skip_stack.items()
-        for index_row, row in enumerate(group.children[skip:], start=skip):
+        for index_row in range(skip, len(group.children)):
+            row = group.children[index_row]
             row.index = index_row
 
             if new_group_children:
@@ -254,8 +258,9 @@ def table_layout(context, table, bottom_space, skip_stack, containing_block,
 
             # Set row height.
             for cell in row.children:
-                ending_cells_by_row[cell.rowspan - 1].append(cell)
-            ending_cells = ending_cells_by_row.pop(0)
+                ending_index = index_row + cell.rowspan - 1
+                ending_cells_by_row.setdefault(ending_index, []).append(cell)
+            ending_cells = ending_cells_by_row.pop(index_row, ())
             if ending_cells:  # in this row
                 if row.height == 'auto':
                     row_bottom_y = max(
@@ -380,6 +385,35 @@ def table_layout(context, table, bottom_space, skip_stack, containing_block,
 
         return group, resume_at, next_page
 
+    def repeated_group_layout(group, position_y, bottom_space):
+        # Headers and footers are repeated on each page with the same widths,
+        # their layout is cached until the end of the table and translated to
+        # the requested position.
+        available_height = context.page_bottom - bottom_space - position_y
+        key = (
+            group, tuple(column_widths), tuple(column_positions), rows_left_x,
+            available_height)
+        cached_groups = context.repeated_table_groups.setdefault(table, {})
+        if (cached := cached_groups.get(key)) is not None:
+            cached_group, next_page = cached
+            new_group = cached_group.deepcopy()
+            new_group.translate(dy=position_y - cached_group.position_y)
+            return new_group, None, next_page.copy()
+
+        # Don’t cache groups including out-of-flow boxes and footnotes, as
+        # they are registered during the layout.
+        out_of_flow = (
+            len(absolute_boxes), len(fixed_boxes),
+            len(context.current_page_footnotes), len(context.reported_footnotes))
+        new_group, resume_at, next_page = group_layout(
+            group, position_y, bottom_space, skip_stack=None, page_is_empty=False)
+        cacheable = new_group and not resume_at and out_of_flow == (
+            len(absolute_boxes), len(fixed_boxes),
+            len(context.current_page_footnotes), len(context.reported_footnotes))
+        if cacheable:
+            cached_groups[key] = (new_group.deepcopy(), next_page.copy())
+        return new_group, resume_at, next_page
+
     def body_groups_layout(skip_stack, position_y, bottom_space, page_is_empty):
         if skip_stack is None:
             skip = 0
@@ -389,13 +423,13 @@ def table_layout(context, table, bottom_space, skip_stack, containing_block,
         resume_at = None
         next_page = {'break': 'any', 'page': None}
 
-        for i, group in enumerate(table.children[skip:]):
+        for index_group in range(skip, len(table.children)):
+            group = table.children[index_group]
             if group.is_header or group.is_footer:
                 continue
 
             # Index is useless for headers and footers, as we never want to
             # break pages after the header or before the footer.
-            index_group = i + skip
             group.index = index_group
 
             if new_table_children:
@@ -463,9 +497,8 @@ def table_layout(context, table, bottom_space, skip_stack, containing_block,
 
         if has_header:
             header = table.children[0]
-            header, resume_at, next_page = group_layout(
-                header, position_y, header_footer_bottom_space,
-                skip_stack=None, page_is_empty=False)
+            header, resume_at, next_page = repeated_group_layout(
+                header, position_y, header_footer_bottom_space)
             if header and not resume_at:
                 header_height = header.height + border_spacing_y
             else:
@@ -476,9 +509,8 @@ def table_layout(context, table, bottom_space, skip_stack, containing_block,
 
         if has_footer:
             footer = table.children[-1]
-            footer, resume_at, next_page = group_layout(
-                footer, position_y, header_footer_bottom_space,
-                skip_stack=None, page_is_empty=False)
+            footer, resume_at, next_page = repeated_group_layout(
+                footer, position_y, header_footer_bottom_space)
             if footer and not resume_at:
                 footer_height = footer.height + border_spacing_y
             else:
@@ -562,6 +594,10 @@ def table_layout(context, table, bottom_space, skip_stack, containing_block,
     header, new_table_children, footer, position_y, resume_at, next_page = (
         all_groups_layout())
 
+    if resume_at is None:
+        # The table is not split anymore, forget its repeated groups.
+        context.repeated_table_groups.pop(table, None)
+
     if new_table_children is None:
         assert resume_at is None
         table = None
@@ -968,40 +1004,56 @@ def collapse_table_borders(table, grid_width, grid_height):
     horizontal_borders = [
         [weak_null_border] * grid_width for _ in range(grid_height + 1)]
 
-    def set_one_border(border_grid, box_style, side, grid_x, grid_y):
+    def get_border(box_style, side):
         from ..draw.color import get_color
 
         style = box_style[f'border_{side}_style']
         width = box_style[f'border_{side}_width']
-        color = get_color(box_style, f'border_{side}_color')
 
         # See https://www.w3.org/TR/CSS21/tables.html#border-conflict-resolution.
         score = ((1 if style == 'hidden' else 0), width, style_scores[style])
+        if score <= weak_null_border[0]:
+            # This border can't win over any other one.
+            return None
 
-        style = style_map.get(style, style)
-        previous_score, _ = border_grid[grid_y][grid_x]
-        # Strict < so that the earlier call wins in case of a tie.
-        if previous_score < score:
-            border_grid[grid_y][grid_x] = (score, (style, width, color))
+        color = get_color(box_style, f'border_{side}_color')
+        return score, (style_map.get(style, style), width, color)
+
+    def set_vertical_border(border, x, y1, y2):
+        if border is None:
+            return
+        score = border[0]
+        for grid_row in vertical_borders[y1:y2]:
+            # Strict < so that the earlier call wins in case of a tie.
+            if grid_row[x][0] < score:
+                grid_row[x] = border
+
+    def set_horizontal_border(border, x_range, y):
+        if border is None:
+            return
+        score = border[0]
+        grid_row = horizontal_borders[y]
+        for x in x_range:
+            # Strict < so that the earlier call wins in case of a tie.
+            if grid_row[x][0] < score:
+                grid_row[x] = border
 
     def set_borders(box, x, y, w, h):
         style = box.style
+        left, right, top, bottom = (
+            get_border(style, side) for side in ('left', 'right', 'top', 'bottom'))
 
         # x and y are logical (possibly rtl), but borders are graphical (always ltr).
         if table.style['direction'] == 'ltr':
-            for yy in range(y, y + h):
-                set_one_border(vertical_borders, style, 'left', x, yy)
-                set_one_border(vertical_borders, style, 'right', x + w, yy)
-            for xx in range(x, x + w):
-                set_one_border(horizontal_borders, style, 'top', xx, y)
-                set_one_border(horizontal_borders, style, 'bottom', xx, y + h)
+            set_vertical_border(left, x, y, y + h)
+            set_vertical_border(right, x + w, y, y + h)
+            x_range = range(x, x + w)
         else:
-            for yy in range(y, y + h):
-                set_one_border(vertical_borders, style, 'left', -1 - w - x, yy)
-                set_one_border(vertical_borders, style, 'right', -1 - x, yy)
-            for xx in range(-1 - x, -1 - x - w, -1):
-                set_one_border(horizontal_borders, style, 'top', xx, y)
-                set_one_border(horizontal_borders, style, 'bottom', xx, y + h)
+            set_vertical_border(left, -1 - w - x, y, y + h)
+            set_vertical_border(right, -1 - x, y, y + h)
+            x_range = range(-1 - x, -1 - x - w, -1)
+        set_horizontal_border(top, x_range, y)
+        set_horizontal_border(bottom, x_range, y + h)
 
     # Set cell borders. The order is important here:
     # "A style set on a cell wins over one on a row, which wins over a